@@ -3,28 +3,40 @@ from __future__ import annotations
 import asyncio
 import os
 import time
-import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from secrets import token_hex
 from typing import Any
 
 import httpx
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, BackgroundTasks, FastAPI, HTTPException, Request, status
 
 from mem import write as mem_write
 
 router = APIRouter()
 
+
 # --------------------------------------------------------------------------- #
 # In-memory task table                                                        #
 # --------------------------------------------------------------------------- #
-# {task_id: {"state": str, "result": Any | None, "created": float}}
-_TASKS: dict[str, dict[str, Any]] = {}
-_LOCK = asyncio.Lock()  # cheap protection for concurrent writers
+@dataclass(slots=True)
+class _Task:
+    state: str
+    result: Any
+    created: float
+
+
+# {task_id: _Task}
+# Tasks are only touched from the event loop, so no lock is needed. They are
+# inserted in creation order, so the oldest task is always at the front.
+_TASKS: "OrderedDict[str, _Task]" = OrderedDict()
 _TTL = 3600  # seconds before we evict old tasks
+_EVICT_INTERVAL = _TTL / 10  # seconds between background sweeps
+_MAX_TASKS = 10_000  # hard cap; the oldest tasks are dropped past this
 
 
 def _new_id() -> str:
-    return uuid.uuid4().hex[:12]
+    return token_hex(6)  # 12 hex chars without building a UUID object
 
 
 async def _execute_temporal(target: str, payload: dict[str, Any], task_id: str) -> Any:
@@ -46,6 +58,7 @@ async def _execute_temporal(target: str, payload: dict[str, Any], task_id: str)
 
 
 async def _forward_call(
+    app: FastAPI,
     body: dict[str, Any],
     headers: dict[str, str],
     task_id: str,
@@ -55,11 +68,15 @@ async def _forward_call(
     """
     Fire-and-forget helper that forwards the wrapped `input` to the chat engine
     and stores the result (or error) in `_TASKS[task_id]`.
+
+    Uses the pooled client on `app.state.http` when the gateway lifespan has
+    created one, so consecutive tasks reuse upstream connections.
     """
     target = body.get("target_url") or "http://127.0.0.1:8080/api/chat"
 
-    async with _LOCK:
-        _TASKS[task_id]["state"] = "in_progress"
+    # Hold our own reference: the _MAX_TASKS cap may drop the entry meanwhile
+    task = _TASKS.get(task_id) or _Task("queued", None, time.time())
+    task.state = "in_progress"
 
     await mem_write(
         {
@@ -77,16 +94,22 @@ async def _forward_call(
             result = await _execute_temporal(target, body["input"], task_id)
             state = "done"
         else:
-            async with httpx.AsyncClient(timeout=60) as cli:
-                resp = await cli.post(target, json=body["input"], headers=headers)
+            client: httpx.AsyncClient | None = getattr(app.state, "http", None)
+            if client is not None:
+                resp = await client.post(
+                    target, json=body["input"], headers=headers, timeout=60
+                )
+            else:  # router mounted without the gateway lifespan
+                async with httpx.AsyncClient(timeout=60) as cli:
+                    resp = await cli.post(target, json=body["input"], headers=headers)
             result = resp.json()
             state = "done"
     except Exception as exc:  # noqa: BLE001 – surfacing any network/json error
         result = {"detail": str(exc)}
         state = "error"
 
-    async with _LOCK:
-        _TASKS[task_id].update(state=state, result=result)
+    task.state = state
+    task.result = result
 
     await mem_write(
         {
@@ -102,12 +125,24 @@ async def _forward_call(
 
 
 async def _evict_expired() -> None:
-    """Remove tasks older than _TTL seconds to keep memory bounded."""
+    """Remove tasks older than _TTL seconds to keep memory bounded.
+
+    Only the expired prefix of the table is touched, so a sweep costs O(k) in
+    the number of evicted tasks rather than O(N) in the table size.
+    """
     now = time.time()
-    async with _LOCK:
-        for tid in list(_TASKS.keys()):
-            if now - _TASKS[tid]["created"] > _TTL:
-                _TASKS.pop(tid, None)
+    while _TASKS:
+        task = next(iter(_TASKS.values()))
+        if now - task.created <= _TTL:
+            break
+        _TASKS.popitem(last=False)
+
+
+async def _evict_loop() -> None:
+    """Sweep expired tasks periodically; started once by the app lifespan."""
+    while True:
+        await asyncio.sleep(_EVICT_INTERVAL)
+        await _evict_expired()
 
 
 # --------------------------------------------------------------------------- #
@@ -123,8 +158,9 @@ async def tasks_send(req: Request, bg: BackgroundTasks):
         )
 
     task_id = _new_id()
-    async with _LOCK:
-        _TASKS[task_id] = {"state": "queued", "result": None, "created": time.time()}
+    _TASKS[task_id] = _Task("queued", None, time.time())
+    while len(_TASKS) > _MAX_TASKS:
+        _TASKS.popitem(last=False)  # O(1) drop of the oldest task
 
     # Forward only non-None headers; JWT is mandatory, session optional
     base_headers = {
@@ -137,22 +173,23 @@ async def tasks_send(req: Request, bg: BackgroundTasks):
     sub = getattr(req.state, "sub", "")
     bg.add_task(
         _forward_call,
+        req.app,
         body,
         headers,
         task_id,
         sid,
         sub,
     )
-    bg.add_task(_evict_expired)
 
     return {"task_id": task_id, "state": "queued"}
 
 
 @router.get("/tasks/status/{task_id}")
-async def tasks_status(task_id: str):
+async def tasks_status(task_id: str) -> dict[str, Any]:
     task = _TASKS.get(task_id)
-    if not task:
+    if task is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="unknown task"
         )
-    return JSONResponse(task)
+    # The return annotation lets FastAPI serialize straight to bytes via Pydantic
+    return {"state": task.state, "result": task.result, "created": task.created}
@@ -2,24 +2,28 @@
 Main gateway factory - clean imports from packaged modules
 """
 
+import asyncio
+import logging
 import os
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import Any, Optional
 
-import weaviate
+import httpx
 from fastapi import APIRouter, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
 from pydantic import BaseModel
 
-from a2a.routes import router as a2a_router
-from auth.oidc import _require_env
 import logs
-logs_router = logs.router
+import mem
+from a2a.routes import _evict_loop
+from a2a.routes import router as a2a_router
+from auth.oidc import _require_env, close_http_client, jwks_refresher
 from mem import get_memory_backend
-from middleware.auth import jwt_auth_mw
-from middleware.session import session_mw
+from middleware.auth import JwtAuthMiddleware, shutdown_verify_pool
+from middleware.session import SessionMiddleware
+from proxy.engine import engine_client
 from proxy.engine import router as proxy_router
+from usage.backends import NullUsageBackend, QueuedUsageBackend
 from usage.factory import _select_backend, get_usage_backend
 from usage.metrics import mount_metrics
 from utils.env import int_env
@@ -27,27 +31,30 @@ from utils.env import int_env
 # Guard TokenQuotaMiddleware import (matches main.py pattern)
 try:
     from middleware.quota import TokenQuotaMiddleware
+
     QUOTA_AVAILABLE = True
 except ImportError:  # optional extra not installed
     QUOTA_AVAILABLE = False
 
 # Import version from parent package
 from . import __version__
+from .mem_events import EVENT_FIELDS, weaviate_client
+
+log = logging.getLogger(__name__)
+logs_router = logs.router
 
 mem_router = APIRouter(prefix="/mem", tags=["memory"])
 
 
 @mem_router.get("/events")
-async def get_memory_events(request: Request, limit: int = 10):
+async def get_memory_events(request: Request, limit: int = 10) -> dict[str, Any]:
     """Fetch recent MemoryEvent objects from Weaviate."""
     try:
         user_sub = getattr(request.state, "sub", None)
         if not user_sub:
             raise HTTPException(status_code=401, detail="User not authenticated")
 
-        client = weaviate.Client(os.getenv("WEAVIATE_URL", "http://localhost:6666"))
-        if not client.is_ready():
-            raise HTTPException(status_code=503, detail="Weaviate is not ready")
+        client = weaviate_client(request.app)
 
         try:
             schema = client.schema.get()
@@ -57,37 +64,27 @@ async def get_memory_events(request: Request, limit: int = 10):
         except Exception:
             return {"data": {"Get": {"MemoryEvent": []}}}
 
-        result = (
-            client.query.get("MemoryEvent", ["timestamp", "event", "user", "state"])
-            .with_additional(["id"])
-            .with_limit(limit)
-            .with_sort([{"path": ["timestamp"], "order": "desc"}])
-            .do()
+        # A single REST call returns every property, including the nested
+        # `result` object that a GraphQL Get cannot select without sub-fields.
+        raw = (
+            client.data_object.get(
+                class_name="MemoryEvent",
+                limit=limit,
+                sort={"properties": ["timestamp"], "order_asc": False},
+            )
+            or {}
         )
-
-        if "errors" in result or "data" not in result:
-            raise HTTPException(status_code=500, detail="Error fetching events")
-
-        events = result["data"]["Get"]["MemoryEvent"]
-        try:
-            raw_objects = client.data_object.get(class_name="MemoryEvent", limit=limit)
-            id_map = {
-                obj.get("id"): obj.get("properties", {})
-                for obj in raw_objects.get("objects", [])
-            }
-            for event in events:
-                eid = event.get("_additional", {}).get("id")
-                if eid in id_map:
-                    props = id_map[eid]
-                    if "result" in props:
-                        event["result"] = props["result"]
-                    for field in ["event", "session_id", "task_id", "user"]:
-                        if field in props:
-                            event[field] = props[field]
-        except Exception:
-            pass
-
-        return result
+        events = []
+        for obj in raw.get("objects", []):
+            props = obj.get("properties", {})
+            event = {f: props[f] for f in EVENT_FIELDS if f in props}
+            event["_additional"] = {"id": obj.get("id")}
+            events.append(event)
+
+        # Same shape as the GraphQL response the UI already consumes
+        return {"data": {"Get": {"MemoryEvent": events}}}
+    except HTTPException:
+        raise
     except Exception as e:  # pragma: no cover - error path
         raise HTTPException(
             status_code=500, detail=f"Error fetching memory events: {e}"
@@ -111,13 +108,33 @@ async def lifespan(app: FastAPI):
     """Manage application lifespan - startup and shutdown."""
     # Startup
     backend_selector = _select_backend()
-    app.state.usage = get_usage_backend(backend_selector)
+    usage = get_usage_backend(backend_selector)
+    # Record usage from a background task so requests never wait on the sink
+    app.state.usage = (
+        usage if isinstance(usage, NullUsageBackend) else QueuedUsageBackend(usage)
+    )
     mount_metrics(app)
-    
+    # Shared upstream pool – reused by A2A forwards instead of a client per task
+    app.state.http = httpx.AsyncClient(
+        timeout=60,
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+    )
+    # Separate pool for /api/chat streams (see proxy.engine.engine_client)
+    app.state.engine_http = engine_client()
+    evict_task = asyncio.create_task(_evict_loop())
+    jwks_task = asyncio.create_task(jwks_refresher())
+
     yield
-    
+
     # Shutdown
-    if hasattr(app.state.usage, 'aclose'):
+    evict_task.cancel()
+    jwks_task.cancel()
+    await app.state.http.aclose()
+    await app.state.engine_http.aclose()
+    await close_http_client()
+    shutdown_verify_pool()
+    await mem.aclose()
+    if hasattr(app.state.usage, "aclose"):
         await app.state.usage.aclose()
 
 
@@ -135,6 +152,9 @@ def create_app(config: Optional[AttachConfig] = None) -> FastAPI:
         app = create_app(config)
     """
     if config is None:
+        from dotenv import load_dotenv
+
+        load_dotenv()  # once per app, not on every module import
         issuer = os.getenv("OIDC_ISSUER") or _require_env("OIDC_ISSUER")
         audience = os.getenv("OIDC_AUD") or _require_env("OIDC_AUD")
         config = AttachConfig(
@@ -155,7 +175,7 @@ def create_app(config: Optional[AttachConfig] = None) -> FastAPI:
     )
 
     @app.get("/auth/config")
-    async def auth_config():
+    async def auth_config() -> dict[str, str | None]:
         return {
             "domain": config.auth0_domain,
             "client_id": config.auth0_client,
@@ -170,14 +190,17 @@ def create_app(config: Optional[AttachConfig] = None) -> FastAPI:
         allow_headers=["*"],
         allow_credentials=True,
     )
-    
-    # Only add quota middleware if available and explicitly configured
-    limit = int_env("MAX_TOKENS_PER_MIN", 60000)
-    if QUOTA_AVAILABLE and limit is not None:
+
+    # Only add quota middleware if available and enabled (0 or none disables)
+    limit = int_env("MAX_TOKENS_PER_MIN", 60000, allow_zero=True)
+    if QUOTA_AVAILABLE and limit:
         app.add_middleware(TokenQuotaMiddleware)
+        log.info("Token quota enabled: %s tokens/min", limit)
+    else:
+        log.info("Token quota disabled")
 
-    app.add_middleware(BaseHTTPMiddleware, dispatch=jwt_auth_mw)
-    app.add_middleware(BaseHTTPMiddleware, dispatch=session_mw)
+    app.add_middleware(JwtAuthMiddleware)
+    app.add_middleware(SessionMiddleware)
 
     # Add routes
     app.include_router(a2a_router, prefix="/a2a")
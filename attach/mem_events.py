@@ -0,0 +1,50 @@
+"""
+Weaviate client helper shared by the /mem/events routes in main.py and
+attach.gateway.
+"""
+
+import os
+from typing import TYPE_CHECKING
+
+from fastapi import FastAPI, HTTPException
+
+if TYPE_CHECKING:
+    import weaviate
+
+# MemoryEvent properties returned by /mem/events
+EVENT_FIELDS = (
+    "timestamp",
+    "event",
+    "user",
+    "state",
+    "result",
+    "session_id",
+    "task_id",
+)
+
+
+def weaviate_client(app: FastAPI) -> "weaviate.Client":
+    """Return the app-wide Weaviate client, or raise 503 if Weaviate is down.
+
+    The client is built on first use and cached on `app.state.weaviate`, but
+    readiness is still probed on every request. A failed probe drops the
+    cached client so the next request reconnects.
+    """
+    client = getattr(app.state, "weaviate", None)
+    if client is None:
+        import weaviate  # deferred: slow to import and only needed here
+
+        try:
+            client = weaviate.Client(os.getenv("WEAVIATE_URL", "http://localhost:6666"))
+        except Exception:
+            raise HTTPException(status_code=503, detail="Weaviate is not ready")
+        app.state.weaviate = client
+
+    try:
+        ready = client.is_ready()
+    except Exception:
+        ready = False
+    if not ready:
+        app.state.weaviate = None
+        raise HTTPException(status_code=503, detail="Weaviate is not ready")
+    return client
@@ -1,19 +1,70 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import logging
 import os
+import threading
 import time
-from functools import lru_cache
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache, partial
 from typing import Any
 
 import httpx
-from jose import jwt
+from jose import JWTError, jwk, jwt
 
-from dotenv import load_dotenv
-load_dotenv()
+from utils.env import int_env
+
+logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
 
-ACCEPTED_ALGS: set[str] = {"RS256", "ES256"}
+ACCEPTED_ALGS: frozenset[str] = frozenset({"RS256", "ES256"})
+
+
+class TokenExchangeError(ValueError):
+    """The Descope exchange could not be completed (transport, 5xx, config).
+
+    Says nothing about the token itself, so it is never cached as a rejection.
+    """
+
+
+@dataclass(slots=True, frozen=True)
+class _CachedClaims:
+    deadline: float  # time.monotonic() after which the entry is stale
+    claims: dict[str, Any]
+
+
+# Verified claims keyed by a token digest: {digest: _CachedClaims}, in LRU
+# order. Clients resend the same bearer token for its whole lifetime, so this
+# skips the asymmetric signature check on every request after the first.
+# Entries live until min(exp, now + JWT_CACHE_TTL); JWT_CACHE_TTL=none caches
+# to exp. Past JWT_CACHE_SIZE the least recently used token is dropped.
+# Both settings are read on first use (see `_verify_cache_limits`).
+_VERIFY_CACHE: "OrderedDict[bytes, _CachedClaims]" = OrderedDict()
+
+# Recently rejected tokens: {digest: (monotonic_deadline, error message)}
+# Kept briefly and sized separately so a flood of bad tokens costs a dict
+# lookup each instead of a JWKS lookup and signature check.
+_REJECT_CACHE: dict[bytes, tuple[float, str]] = {}
+_REJECT_CACHE_MAX = 2048
+_REJECT_CACHE_TTL = 2  # seconds
+
+# {issuer: {"ts": monotonic, "keys": [...], "index": {kid: key},
+#           "parsed": {(kid, alg): Key}}}
+_JWKS_CACHE: dict[str, dict[str, Any]] = {}
+_JWKS_TTL = 600  # seconds
+_JWKS_MISS_REFETCH = 30  # min seconds between JWKS refetches triggered by unknown kids
+_JWKS_REFRESHING: set[str] = set()  # issuers with a background refresh in flight
+_JWKS_FETCH_LOCKS: dict[str, threading.Lock] = {}  # single-flight blocking fetches
+_BG_TASKS: set[asyncio.Task] = set()  # strong refs so refresh tasks aren't GC'd
+_JWKS_LOOP: asyncio.AbstractEventLoop | None = None  # app loop, set by jwks_refresher
+
+# Exchange-path verifications in flight, by token digest (see verify_jwt_with_exchange)
+_EXCHANGE_INFLIGHT: dict[bytes, asyncio.Task] = {}
+
+_HTTP: httpx.AsyncClient | None = None
 
 
 # --------------------------------------------------------------------------- #
@@ -27,22 +78,33 @@ def _require_env(var: str) -> str:
     return val
 
 
+@lru_cache(maxsize=1)
 def _get_oidc_issuer() -> str:
-    """Get OIDC issuer from environment, validated and normalized."""
+    """Get OIDC issuer from environment (read once), validated and normalized."""
     issuer = os.getenv("OIDC_ISSUER", "")
     if not issuer:
         raise RuntimeError("OIDC_ISSUER must be set (see README for setup)")
     return issuer
 
 
+@lru_cache(maxsize=1)
 def _get_oidc_audience() -> str:
-    """Get OIDC audience from environment, validated."""
+    """Get OIDC audience from environment (read once), validated."""
     audience = os.getenv("OIDC_AUD", "")
     if not audience:
         raise RuntimeError("OIDC_AUD must be set (see README for setup)")
     return audience
 
 
+@lru_cache(maxsize=1)
+def _verify_cache_limits() -> tuple[int, int | None]:
+    """(JWT_CACHE_SIZE, JWT_CACHE_TTL), read on first use so .env is honoured."""
+    return (
+        int_env("JWT_CACHE_SIZE", 10_000) or 10_000,
+        int_env("JWT_CACHE_TTL", 300),
+    )
+
+
 def _get_auth_backend() -> str:
     """Get authentication backend from environment."""
     return os.getenv("AUTH_BACKEND", "auth0")
@@ -61,35 +123,204 @@ def _get_jwks_url(issuer: str) -> str:
         return f"https://api.descope.com/{project_id}/.well-known/jwks.json"
     else:
         if "api.descope.com/v1/apps/" in issuer:
-            project_id = issuer.split("/")[-1] 
+            project_id = issuer.split("/")[-1]
             return f"https://api.descope.com/{project_id}/.well-known/jwks.json"
         else:
             base_url = issuer.rstrip("/")
             return f"{base_url}/.well-known/jwks.json"
 
 
-@lru_cache(maxsize=4)
+def _http_client() -> httpx.AsyncClient:
+    """
+    Return the module's shared AsyncClient, creating it on first use.
+
+    Used for JWKS refreshes and Descope token exchange so both keep their
+    connections to the identity provider alive between calls.
+    """
+    global _HTTP
+    if _HTTP is None:
+        _HTTP = httpx.AsyncClient(
+            timeout=5,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _HTTP
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client; called from the app lifespan."""
+    global _HTTP
+    if _HTTP is not None:
+        await _HTTP.aclose()
+        _HTTP = None
+
+
+def _store_jwks(issuer: str, keys: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Cache *keys* for *issuer*.
+
+    Alongside the raw key list we keep a `kid -> key` index so verification
+    is a dict lookup instead of a scan over the key set. `parsed` is filled
+    lazily by `_signing_key` and is dropped together with the key set.
+    """
+    entry = {
+        "ts": time.monotonic(),
+        "keys": keys,
+        "index": {k["kid"]: k for k in keys if "kid" in k},
+        "parsed": {},
+    }
+    _JWKS_CACHE[issuer] = entry
+    return entry
+
+
 def _fetch_jwks(issuer: str) -> dict[str, Any]:
     """
-    Download the issuer's JWKS once and keep it in memory.
+    Download the issuer's JWKS (blocking) and keep it in memory.
+
+    Only used when nothing is cached yet or a `kid` is unknown; routine
+    refreshes go through `_fetch_jwks_async` off the request path.
     """
     url = _get_jwks_url(issuer)
 
     resp = httpx.get(url, timeout=5)
     resp.raise_for_status()
 
-    return {"ts": time.time(), "keys": resp.json()["keys"]}
+    return _store_jwks(issuer, resp.json()["keys"])
+
+
+def _fetch_jwks_once(
+    issuer: str, *, newer_than: float = float("-inf")
+) -> dict[str, Any]:
+    """
+    Single-flight `_fetch_jwks`.
+
+    Verifications run on worker threads, so a cold cache or a rotated key
+    can hit many of them at once. Only one thread fetches; the others wait
+    and reuse its entry if it is newer than *newer_than*.
+    """
+    with _JWKS_FETCH_LOCKS.setdefault(issuer, threading.Lock()):
+        cached = _JWKS_CACHE.get(issuer)
+        if cached is not None and cached["ts"] > newer_than:
+            return cached
+        return _fetch_jwks(issuer)
+
+
+async def _fetch_jwks_async(issuer: str) -> dict[str, Any]:
+    """Non-blocking variant of `_fetch_jwks` using the shared client."""
+    url = _get_jwks_url(issuer)
+
+    resp = await _http_client().get(url)
+    resp.raise_for_status()
+
+    return _store_jwks(issuer, resp.json()["keys"])
+
+
+async def _refresh_in_background(issuer: str) -> None:
+    try:
+        await _fetch_jwks_async(issuer)
+    except Exception as exc:  # keep serving the stale keys
+        logger.warning("JWKS refresh for %s failed: %s", issuer, exc)
+    finally:
+        _JWKS_REFRESHING.discard(issuer)
+
+
+def _start_refresh(issuer: str) -> None:
+    """Start a background refresh for *issuer*; must run on the event loop."""
+    if issuer in _JWKS_REFRESHING:
+        return
+    _JWKS_REFRESHING.add(issuer)
+    task = asyncio.get_running_loop().create_task(_refresh_in_background(issuer))
+    _BG_TASKS.add(task)
+    task.add_done_callback(_BG_TASKS.discard)
+
+
+def _schedule_refresh(issuer: str, stale_ts: float) -> None:
+    """
+    Refresh *issuer*'s JWKS without blocking the caller when a loop runs.
+
+    `verify_jwt` runs on worker threads (see middleware.auth), which have no
+    running loop; they hand the refresh to the app loop and keep serving the
+    stale keys. Only a caller with no loop at all fetches inline, and then
+    only one thread per issuer does.
+    """
+    if issuer in _JWKS_REFRESHING:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = _JWKS_LOOP
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(_start_refresh, issuer)
+            return
+        try:
+            _fetch_jwks_once(issuer, newer_than=stale_ts)
+        except Exception as exc:  # keep serving the stale keys
+            logger.warning("JWKS refresh for %s failed: %s", issuer, exc)
+        return
+    _start_refresh(issuer)
+
 
+def _jwks_entry(issuer: str) -> dict[str, Any]:
+    """
+    Return the cached JWKS entry (stale-while-revalidate).
 
-def _jwks(issuer: str) -> list[dict[str, Any]]:
+    Entries older than the TTL are still served while a refresh runs in the
+    background; only a cold cache fetches inline.
     """
-    Return the cached JWKS; refresh every 10 minutes.
+    cached = _JWKS_CACHE.get(issuer)
+    if cached is None:
+        return _fetch_jwks_once(issuer)
+    if time.monotonic() - cached["ts"] > _JWKS_TTL:
+        _schedule_refresh(issuer, cached["ts"])
+    return cached
+
+
+async def jwks_refresher() -> None:
     """
-    cached = _fetch_jwks(issuer)
-    if time.time() - cached["ts"] > 600:  # 10 min TTL
-        _fetch_jwks.cache_clear()
-        cached = _fetch_jwks(issuer)
-    return cached["keys"]
+    Keep every known issuer's JWKS warm; started once by the app lifespan.
+
+    Refreshes at 80 % of the TTL so request-time lookups never find a stale
+    entry. The configured `OIDC_ISSUER` is pre-warmed on the first pass.
+    Also records the app loop so worker-thread verifications can hand
+    stale-entry refreshes to it.
+    """
+    global _JWKS_LOOP
+    _JWKS_LOOP = asyncio.get_running_loop()
+    while True:
+        issuers = set(_JWKS_CACHE)
+        if configured := os.getenv("OIDC_ISSUER"):
+            issuers.add(configured)
+        for issuer in issuers:
+            try:
+                await _fetch_jwks_async(issuer)
+            except Exception as exc:
+                logger.warning("JWKS refresh for %s failed: %s", issuer, exc)
+        await asyncio.sleep(_JWKS_TTL * 0.8)
+
+
+def _signing_key(issuer: str, kid: str, alg: str) -> jwk.Key:
+    """Return the parsed verification key for *kid*, refreshing the JWKS once on a miss.
+
+    The kid comes from an unverified header, so misses are rate-limited per
+    issuer: a JWKS fetched within `_JWKS_MISS_REFETCH` seconds is trusted as
+    current instead of refetched. Parsed keys are memoised per key set, so the
+    JWK -> RSA/EC key construction happens once rather than on every decode.
+    """
+    entry = _jwks_entry(issuer)
+    parsed = entry["parsed"].get((kid, alg))
+    if parsed is not None:
+        return parsed
+
+    key_cfg = entry["index"].get(kid)
+    if key_cfg is None:
+        if time.monotonic() - entry["ts"] < _JWKS_MISS_REFETCH:
+            raise ValueError("signing key not found in issuer JWKS")
+        entry = _fetch_jwks_once(issuer, newer_than=entry["ts"])
+        key_cfg = entry["index"].get(kid)
+        if key_cfg is None:
+            raise ValueError("signing key not found in issuer JWKS")
+
+    parsed = entry["parsed"][(kid, alg)] = jwk.construct(key_cfg, alg)
+    return parsed
 
 
 async def _exchange_jwt_descope(
@@ -104,24 +335,31 @@ async def _exchange_jwt_descope(
     descope_client_id = _require_env("DESCOPE_CLIENT_ID")
     descope_client_secret = _require_env("DESCOPE_CLIENT_SECRET")
 
-    token_endpoint = f"{descope_base_url}/oauth2/v1/apps/token" 
+    token_endpoint = f"{descope_base_url}/oauth2/v1/apps/token"
 
     grant_data = {
-        "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer",  
+        "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer",
         "assertion": external_jwt,
         "client_id": descope_client_id,
         "client_secret": descope_client_secret,
         "issuer": external_issuer,
     }
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            token_endpoint,
-            data=grant_data,
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-        )
-        response.raise_for_status()
-        return response.json()["access_token"]
+
+    # Shared keep-alive pool: no TLS handshake to Descope per exchange
+    response = await _http_client().post(
+        token_endpoint,
+        data=grant_data,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+        timeout=10,
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def _require_compact_jws(token: str) -> None:
+    """Reject anything that isn't header.payload.signature before decoding it."""
+    if token.count(".") != 2:
+        raise ValueError("malformed JWT")
 
 
 def _verify_jwt_direct(token: str, *, leeway: int = 60) -> dict[str, Any]:
@@ -138,11 +376,12 @@ def _verify_jwt_direct(token: str, *, leeway: int = 60) -> dict[str, Any]:
     Raises:
         ValueError | jose.JWTError on any validation error.
     """
-    # Read fresh environment variables each time
+    # Cached after the first successful read; a missing var still raises
     issuer = _get_oidc_issuer()
     audience = _get_oidc_audience()
 
     # 1) Unverified header inspection
+    _require_compact_jws(token)
     header = jwt.get_unverified_header(token)
     alg = header.get("alg")
     if alg not in ACCEPTED_ALGS:
@@ -152,20 +391,13 @@ def _verify_jwt_direct(token: str, *, leeway: int = 60) -> dict[str, Any]:
     if not kid:
         raise ValueError("JWT header missing 'kid'")
 
-    # 2) Locate JWK (with one forced refresh on miss)
-    keys = _jwks(issuer)
-    key_cfg = next((k for k in keys if k["kid"] == kid), None)
-    if not key_cfg:
-        _fetch_jwks.cache_clear()
-        keys = _jwks(issuer)
-        key_cfg = next((k for k in keys if k["kid"] == kid), None)
-        if not key_cfg:
-            raise ValueError("signing key not found in issuer JWKS")
+    # 2) Locate the parsed key (with one forced refresh on miss)
+    key = _signing_key(issuer, kid, alg)
 
     # 3) Verify + decode
     return jwt.decode(
         token,
-        key_cfg,  # jose selects RSA/ECDSA key automatically
+        key,
         algorithms=[alg],
         audience=audience,
         issuer=issuer,
@@ -177,7 +409,10 @@ def _verify_jwt_direct(token: str, *, leeway: int = 60) -> dict[str, Any]:
         },
     )
 
-def _verify_jwt_against(token: str, issuer: str, *, audience: str, leeway: int = 60) -> dict[str, Any]:
+
+def _verify_jwt_against(
+    token: str, issuer: str, *, audience: str, leeway: int = 60
+) -> dict[str, Any]:
     header = jwt.get_unverified_header(token)
     alg = header.get("alg")
     if alg not in ACCEPTED_ALGS:
@@ -186,74 +421,225 @@ def _verify_jwt_against(token: str, issuer: str, *, audience: str, leeway: int =
     if not kid:
         raise ValueError("JWT header missing 'kid'")
 
-    keys = _jwks(issuer)
-    key_cfg = next((k for k in keys if k["kid"] == kid), None)
-    if not key_cfg:
-        _fetch_jwks.cache_clear()
-        keys = _jwks(issuer)
-        key_cfg = next((k for k in keys if k["kid"] == kid), None)
-        if not key_cfg:
-            raise ValueError("signing key not found in issuer JWKS")
+    key = _signing_key(issuer, kid, alg)
 
     return jwt.decode(
-        token, key_cfg, algorithms=[alg],
-        audience=audience, issuer=issuer,
-        options={"leeway": leeway, "verify_aud": True, "verify_exp": True, "verify_iat": True},
+        token,
+        key,
+        algorithms=[alg],
+        audience=audience,
+        issuer=issuer,
+        options={
+            "leeway": leeway,
+            "verify_aud": True,
+            "verify_exp": True,
+            "verify_iat": True,
+        },
     )
 
+
+async def _verify_via_exchange(
+    token: str, external_issuer: str, *, leeway: int = 60
+) -> dict[str, Any]:
+    """Exchange *token* for a Descope token and verify the result."""
+    descope_token = await _exchange_jwt_descope(token, external_issuer)
+    descope_issuer = (
+        f"https://api.descope.com/v1/apps/{_require_env('DESCOPE_PROJECT_ID')}"
+    )
+    audience = os.getenv("DESCOPE_AUD", _get_oidc_audience())
+    return await asyncio.to_thread(
+        _verify_jwt_against,
+        descope_token,
+        issuer=descope_issuer,
+        audience=audience,
+        leeway=leeway,
+    )
+
+
+def _exchange_failure(message: str, exc: Exception) -> ValueError:
+    """Wrap an exchange error, keeping infrastructure failures distinguishable."""
+    if isinstance(exc, TokenExchangeError) or not (
+        isinstance(exc, (JWTError, ValueError))
+        or (isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code < 500)
+    ):
+        return TokenExchangeError(message)
+    return ValueError(message)  # the token (or Descope's reply to it) is invalid
+
+
 async def verify_jwt_with_exchange(token: str, *, leeway: int = 60) -> dict[str, Any]:
     """
     Exchange an external JWT for a Descope token and verify it.
 
-    First, tries to directly verify the JWT. Then, immediately throws on validation errors without attempting the exchange.
-
-    Attempts the exchange. 
+    Peeks at the unverified `iss` first. Tokens from a foreign issuer go
+    straight to the exchange, since direct verification could only fail for
+    them. Tokens from the configured issuer (or with unreadable claims) are
+    verified directly; validation errors are raised without attempting the
+    exchange, other failures still fall back to it. Successful results are
+    cached the same way as in `verify_jwt`.
 
     Returns:
         Decoded claim set (`dict[str, Any]`) on success.
 
     Raises:
         ValueError | jose.JWTError on any validation error.
-        ValueError if exchange fails.
         ValueError if exchange is not applicable (e.g., missing issuer).
-    """ 
+        TokenExchangeError (a ValueError) if the exchange itself failed.
+    """
+    digest = _token_digest(token)
+    claims = _cached_claims(digest)
+    if claims is not None:
+        return claims
+
+    # A new token usually arrives on several requests at once; they share
+    # one verification, and so one Descope exchange, instead of N
+    task = _EXCHANGE_INFLIGHT.get(digest)
+    if task is None or task.get_loop() is not asyncio.get_running_loop():
+        task = asyncio.ensure_future(_verify_and_cache(token, digest, leeway=leeway))
+        _EXCHANGE_INFLIGHT[digest] = task
+        task.add_done_callback(partial(_forget_exchange, digest))
+    return await asyncio.shield(task)
+
+
+def _forget_exchange(digest: bytes, task: asyncio.Task) -> None:
+    """Done-callback: drop *task* from the in-flight table unless replaced."""
+    if _EXCHANGE_INFLIGHT.get(digest) is task:
+        del _EXCHANGE_INFLIGHT[digest]
+
+
+async def _verify_and_cache(
+    token: str, digest: bytes, *, leeway: int
+) -> dict[str, Any]:
+    try:
+        claims = await _verify_jwt_with_exchange(token, leeway=leeway)
+    except TokenExchangeError:
+        raise  # transient; the next request retries the exchange
+    except (JWTError, ValueError) as exc:
+        _cache_rejection(digest, exc)
+        raise
+    _cache_claims(digest, claims)
+    return claims
+
+
+async def _verify_jwt_with_exchange(token: str, *, leeway: int = 60) -> dict[str, Any]:
+    _require_compact_jws(token)
+    try:
+        external_issuer = jwt.get_unverified_claims(token).get("iss")
+    except Exception:
+        external_issuer = None  # let direct verification report the error
+
+    if external_issuer and external_issuer != _get_oidc_issuer():
+        alg = jwt.get_unverified_header(token).get("alg")
+        if alg not in ACCEPTED_ALGS:
+            raise ValueError(f"alg {alg!r} not allowed")
+        try:
+            return await _verify_via_exchange(token, external_issuer, leeway=leeway)
+        except Exception as exchange_error:
+            raise _exchange_failure(
+                f"JWT verification failed; exchange={exchange_error!s}", exchange_error
+            )
+
     try:
-        return _verify_jwt_direct(token, leeway=leeway)
+        # A cold JWKS or unknown kid means a blocking fetch; keep it off the loop
+        return await asyncio.to_thread(_verify_jwt_direct, token, leeway=leeway)
     except ValueError as direct_error:
         # Don't attempt exchange for validation errors like invalid algorithm or missing kid
-        if any(phrase in str(direct_error) for phrase in [
-            "not allowed", 
-            "missing 'kid'", 
-            "invalid token",
-            "malformed",
-            "expired"
-        ]):
+        if any(
+            phrase in str(direct_error)
+            for phrase in [
+                "not allowed",
+                "missing 'kid'",
+                "invalid token",
+                "malformed",
+                "expired",
+            ]
+        ):
             raise direct_error
-            
+
         try:
-            unverified_claims = jwt.get_unverified_claims(token)
-            external_issuer = unverified_claims.get("iss")
-            
             if not external_issuer:
                 raise ValueError("Cannot extract issuer from token for exchange")
-            
-            descope_token = await _exchange_jwt_descope(token, external_issuer)
-            descope_issuer = f"https://api.descope.com/v1/apps/{_require_env('DESCOPE_PROJECT_ID')}"
-            audience = os.getenv("DESCOPE_AUD", _get_oidc_audience())
-            return _verify_jwt_against(descope_token, issuer=descope_issuer, audience=audience, leeway=leeway)
+            return await _verify_via_exchange(token, external_issuer, leeway=leeway)
         except Exception as exchange_error:
-            raise ValueError(f"JWT verification failed; direct={direct_error!s}; exchange={exchange_error!s}")
-    except Exception as other_error:
-        raise other_error
-
+            raise _exchange_failure(
+                f"JWT verification failed; direct={direct_error!s}; "
+                f"exchange={exchange_error!s}",
+                exchange_error,
+            )
 
 
 # --------------------------------------------------------------------------- #
 # Public API                                                                  #
 # --------------------------------------------------------------------------- #
+def _token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _evict_oldest(cache: dict) -> None:
+    # verify_jwt may run on worker threads (see middleware.auth), so another
+    # thread can resize the dict between iter() and next()
+    try:
+        cache.pop(next(iter(cache)), None)  # oldest first
+    except (RuntimeError, StopIteration):
+        pass
+
+
+def _cached_claims(digest: bytes) -> dict[str, Any] | None:
+    """Return cached claims, or re-raise a cached rejection, for *digest*."""
+    now = time.monotonic()
+    hit = _VERIFY_CACHE.get(digest)
+    if hit is not None:
+        try:
+            if now < hit.deadline:
+                _VERIFY_CACHE.move_to_end(digest)
+                return hit.claims
+            del _VERIFY_CACHE[digest]
+        except KeyError:  # evicted meanwhile by another verify thread
+            pass
+    rejected = _REJECT_CACHE.get(digest)
+    if rejected is not None and now < rejected[0]:
+        raise ValueError(rejected[1])
+    return None
+
+
+def _cache_rejection(digest: bytes, exc: Exception) -> None:
+    if len(_REJECT_CACHE) >= _REJECT_CACHE_MAX:
+        _evict_oldest(_REJECT_CACHE)
+    _REJECT_CACHE[digest] = (time.monotonic() + _REJECT_CACHE_TTL, str(exc))
+
+
+def _cache_claims(digest: bytes, claims: dict[str, Any]) -> None:
+    """Remember successfully verified *claims*; tokens without `exp` are skipped."""
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)):
+        return
+    max_entries, ttl = _verify_cache_limits()
+    lifetime = exp - time.time()
+    if ttl is not None:
+        lifetime = min(lifetime, ttl)
+    if len(_VERIFY_CACHE) >= max_entries:
+        try:
+            _VERIFY_CACHE.popitem(last=False)  # least recently used
+        except KeyError:
+            pass
+    _VERIFY_CACHE[digest] = _CachedClaims(time.monotonic() + lifetime, claims)
+
+
 def verify_jwt(token: str, *, leeway: int = 60) -> dict[str, Any]:
     """
-    Backward-compatible JWT verification 
+    Backward-compatible JWT verification
     async structure with exchange can be called with verify_jwt_with_exchange
+
+    Successful verifications are cached (see `_VERIFY_CACHE`); rejections are
+    remembered for a couple of seconds only (see `_REJECT_CACHE`) and are
+    never served as valid.
     """
-    return _verify_jwt_direct(token, leeway=leeway)
\ No newline at end of file
+    digest = _token_digest(token)
+    claims = _cached_claims(digest)
+    if claims is None:
+        try:
+            claims = _verify_jwt_direct(token, leeway=leeway)
+        except (JWTError, ValueError) as exc:
+            _cache_rejection(digest, exc)
+            raise
+        _cache_claims(digest, claims)
+    return claims
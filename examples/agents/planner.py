@@ -1,8 +1,10 @@
 # examples/agents/planner.py
+import os
+from typing import Any
+
+import httpx
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-import httpx
-import os
 
 app = FastAPI(title="Planner Agent")
 
@@ -16,7 +18,7 @@ class ChatRequest(BaseModel):
 
 
 @app.post("/api/chat")
-async def chat(req: ChatRequest):
+async def chat(req: ChatRequest) -> dict[str, Any]:
     """
     Proxy the incoming conversation to the local Ollama server (or any
     OpenAI‑compatible endpoint) and return its response verbatim so the
@@ -37,4 +39,4 @@ async def chat(req: ChatRequest):
         # surface a clean 502 for gateway diagnostics
         raise HTTPException(status_code=502, detail=f"Ollama request failed: {e}")
 
-    return resp.json()
\ No newline at end of file
+    return resp.json()
@@ -24,8 +24,11 @@ print()
 
 # Fetch the last 10 events, newest first
 result = (
-    client.query.get("MemoryEvent", ["timestamp", "event", "user"])  # Fields that actually exist
+    client.query.get(
+        "MemoryEvent", ["timestamp", "event", "user"]
+    )  # Fields that actually exist
     .with_additional(["id"])
+    .with_sort([{"path": ["timestamp"], "order": "desc"}])
     .with_limit(10)
     .do()
 )
@@ -43,4 +46,4 @@ for o in objs:
     print(json.dumps(o, indent=2)[:600], "...\n")
 
 objs = client.data_object.get(class_name="MemoryEvent", limit=1)
-print(objs)
\ No newline at end of file
+print(objs)
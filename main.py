@@ -1,43 +1,54 @@
+import asyncio
+import logging
 import os
+from contextlib import asynccontextmanager
+from typing import Any
 
-import weaviate
+import httpx
+from dotenv import load_dotenv
 from fastapi import APIRouter, FastAPI, HTTPException, Request
 from fastapi.middleware import Middleware
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from contextlib import asynccontextmanager
 
-from a2a.routes import router as a2a_router
+load_dotenv()  # before the project imports below read their settings
+
 import logs
-logs_router = logs.router
-from middleware.auth import jwt_auth_mw
-from middleware.session import session_mw
+import mem
+from a2a.routes import _evict_loop
+from a2a.routes import router as a2a_router
+from attach.mem_events import EVENT_FIELDS, weaviate_client
+from auth.oidc import close_http_client, jwks_refresher
+from middleware.auth import JwtAuthMiddleware, shutdown_verify_pool
+from middleware.session import SessionMiddleware
+from proxy.engine import engine_client
 from proxy.engine import router as proxy_router
+from usage.backends import NullUsageBackend, QueuedUsageBackend
 from usage.factory import _select_backend, get_usage_backend
 from usage.metrics import mount_metrics
 from utils.env import int_env
 
 try:
     from middleware.quota import TokenQuotaMiddleware
+
     QUOTA_AVAILABLE = True
 except ImportError:
     QUOTA_AVAILABLE = False
 
+log = logging.getLogger(__name__)
+logs_router = logs.router
+
 mem_router = APIRouter(prefix="/mem", tags=["memory"])
 
 
 @mem_router.get("/events")
-async def get_memory_events(request: Request, limit: int = 10):
+async def get_memory_events(request: Request, limit: int = 10) -> dict[str, Any]:
     """Fetch recent MemoryEvent objects from Weaviate."""
     try:
         user_sub = getattr(request.state, "sub", None)
         if not user_sub:
             raise HTTPException(status_code=401, detail="User not authenticated")
 
-        client = weaviate.Client(os.getenv("WEAVIATE_URL", "http://localhost:6666"))
-
-        if not client.is_ready():
-            raise HTTPException(status_code=503, detail="Weaviate is not ready")
+        client = weaviate_client(request.app)
 
         try:
             schema = client.schema.get()
@@ -48,50 +59,28 @@ async def get_memory_events(request: Request, limit: int = 10):
         except Exception:
             return {"data": {"Get": {"MemoryEvent": []}}}
 
-        result = (
-            client.query.get(
-                "MemoryEvent",
-                ["timestamp", "event", "user", "state"],
+        # A single REST call returns every property, including the nested
+        # `result` object that a GraphQL Get cannot select without sub-fields.
+        raw = (
+            client.data_object.get(
+                class_name="MemoryEvent",
+                limit=limit,
+                sort={"properties": ["timestamp"], "order_asc": False},
             )
-            .with_additional(["id"])
-            .with_limit(limit)
-            .with_sort([{"path": ["timestamp"], "order": "desc"}])
-            .do()
+            or {}
         )
-
-        if "errors" in result:
-            raise HTTPException(
-                status_code=500, detail=f"GraphQL error: {result['errors']}"
-            )
-
-        if "data" not in result:
-            raise HTTPException(status_code=500, detail="No data in response")
-
-        events = result["data"]["Get"]["MemoryEvent"]
-
-        try:
-            raw_objects = client.data_object.get(class_name="MemoryEvent", limit=limit)
-
-            id_to_full_object = {}
-            for obj in raw_objects.get("objects", []):
-                obj_id = obj.get("id")
-                if obj_id:
-                    id_to_full_object[obj_id] = obj.get("properties", {})
-
-            for event in events:
-                event_id = event.get("_additional", {}).get("id")
-                if event_id and event_id in id_to_full_object:
-                    full_props = id_to_full_object[event_id]
-                    if "result" in full_props:
-                        event["result"] = full_props["result"]
-                    for field in ["event", "session_id", "task_id", "user"]:
-                        if field in full_props:
-                            event[field] = full_props[field]
-        except Exception:
-            pass
-
-        return result
-
+        events = []
+        for obj in raw.get("objects", []):
+            props = obj.get("properties", {})
+            event = {f: props[f] for f in EVENT_FIELDS if f in props}
+            event["_additional"] = {"id": obj.get("id")}
+            events.append(event)
+
+        # Same shape as the GraphQL response the UI already consumes
+        return {"data": {"Get": {"MemoryEvent": events}}}
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error fetching memory events: {str(e)}"
@@ -102,14 +91,34 @@ async def get_memory_events(request: Request, limit: int = 10):
 async def lifespan(app: FastAPI):
     """Manage application lifespan - startup and shutdown."""
     backend_selector = _select_backend()
-    app.state.usage = get_usage_backend(backend_selector)
+    usage = get_usage_backend(backend_selector)
+    # Record usage from a background task so requests never wait on the sink
+    app.state.usage = (
+        usage if isinstance(usage, NullUsageBackend) else QueuedUsageBackend(usage)
+    )
     mount_metrics(app)
-    
+    app.state.http = httpx.AsyncClient(
+        timeout=60,
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+    )
+    # Separate pool for /api/chat streams (see proxy.engine.engine_client)
+    app.state.engine_http = engine_client()
+    evict_task = asyncio.create_task(_evict_loop())
+    jwks_task = asyncio.create_task(jwks_refresher())
+
     yield
-    
-    if hasattr(app.state.usage, 'aclose'):
+
+    evict_task.cancel()
+    jwks_task.cancel()
+    await app.state.http.aclose()
+    await app.state.engine_http.aclose()
+    await close_http_client()
+    shutdown_verify_pool()
+    await mem.aclose()
+    if hasattr(app.state.usage, "aclose"):
         await app.state.usage.aclose()
 
+
 app = FastAPI(title="attach-gateway", lifespan=lifespan)
 
 # Add middleware in correct order (CORS outer-most)
@@ -121,21 +130,29 @@ app.add_middleware(
     allow_credentials=True,
 )
 
-# Only add quota middleware if available and explicitly configured
-limit = int_env("MAX_TOKENS_PER_MIN", 60000)
-if QUOTA_AVAILABLE and limit is not None:
+# Only add quota middleware if available and enabled (0 or none disables)
+limit = int_env("MAX_TOKENS_PER_MIN", 60000, allow_zero=True)
+if QUOTA_AVAILABLE and limit:
     app.add_middleware(TokenQuotaMiddleware)
+    log.info("Token quota enabled: %s tokens/min", limit)
+else:
+    log.info("Token quota disabled")
+
+app.add_middleware(JwtAuthMiddleware)
+app.add_middleware(SessionMiddleware)
+
+# Read once at import (after load_dotenv); the handler returns it as-is
+_AUTH_CONFIG = {
+    "domain": os.getenv("AUTH0_DOMAIN"),
+    "client_id": os.getenv("AUTH0_CLIENT"),
+    "audience": os.getenv("OIDC_AUD"),
+}
 
-app.add_middleware(BaseHTTPMiddleware, dispatch=jwt_auth_mw)
-app.add_middleware(BaseHTTPMiddleware, dispatch=session_mw)
 
 @app.get("/auth/config")
-async def auth_config():
-    return {
-        "domain": os.getenv("AUTH0_DOMAIN"),
-        "client_id": os.getenv("AUTH0_CLIENT"),
-        "audience": os.getenv("OIDC_AUD"),
-    }
+async def auth_config() -> dict[str, str | None]:
+    return _AUTH_CONFIG
+
 
 app.include_router(a2a_router, prefix="/a2a")
 app.include_router(logs_router)
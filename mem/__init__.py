@@ -1,15 +1,18 @@
-from __future__ import annotations
-
 # mem/__init__.py
+from __future__ import annotations
 
 import asyncio
+import logging
 import os
-from typing import Protocol, Optional, Union
+from typing import Optional, Protocol, Union
+
+log = logging.getLogger(__name__)
 
 
 class MemoryBackend(Protocol):
     async def write(self, event: dict): ...
 
+    # optional: `async def write_many(self, events: list[dict])` for batching
     # add read/query interfaces later
 
 
@@ -44,10 +47,85 @@ def _get_backend() -> MemoryBackend:
     return _memory
 
 
+# --- bounded write queue ----------------------------------------------------
+_QUEUE_MAX = 10_000  # events beyond this are dropped, not buffered
+_BATCH_MAX = 100
+_BATCH_WAIT = 0.2  # seconds to wait for a batch to fill up
+
+_queue: Optional[asyncio.Queue] = None
+_consumer: Optional[asyncio.Task] = None
+
+
+def _ensure_consumer() -> asyncio.Queue:
+    """Start the single writer task on first use (or on a new event loop)."""
+    global _queue, _consumer
+    loop = asyncio.get_running_loop()
+    if _consumer is None or _consumer.done() or _consumer.get_loop() is not loop:
+        _queue = asyncio.Queue(maxsize=_QUEUE_MAX)
+        _consumer = loop.create_task(_drain(_queue))
+    return _queue
+
+
+async def _drain(queue: asyncio.Queue) -> None:
+    """Write queued events in batches of up to `_BATCH_MAX`."""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        deadline = loop.time() + _BATCH_WAIT
+        while len(batch) < _BATCH_MAX:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        backend = _get_backend()
+        try:
+            if hasattr(backend, "write_many"):
+                await backend.write_many(batch)
+            else:
+                for event in batch:
+                    await backend.write(event)
+        except Exception:  # never let one bad batch stop the writer
+            log.warning("Dropping %d memory events", len(batch), exc_info=True)
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+
+async def aclose() -> None:
+    """Flush queued events, then stop the writer; called from the app lifespan."""
+    global _queue, _consumer
+    consumer, queue = _consumer, _queue
+    _consumer = _queue = None
+    if consumer is None or consumer.done():
+        return
+    if consumer.get_loop() is not asyncio.get_running_loop():
+        consumer.cancel()  # stale writer from an earlier loop
+        return
+    await queue.join()
+    consumer.cancel()
+    try:
+        await consumer
+    except asyncio.CancelledError:
+        pass
+
+
 # public helpers -------------------------------------------------------------
 async def write(event: dict):
-    """Fire-and-forget write; never blocks caller."""
-    asyncio.create_task(_get_backend().write(event))
+    """Fire-and-forget write; never blocks caller.
+
+    Events go through a bounded queue drained by one background task, so a
+    burst cannot pile up unbounded tasks or executor jobs.
+    """
+    if isinstance(_get_backend(), NullMemory):
+        return
+    try:
+        _ensure_consumer().put_nowait(event)
+    except asyncio.QueueFull:
+        log.warning("Memory write queue full; dropping event")
 
 
 def get_memory_backend(kind: str = "none", config=None):
@@ -6,14 +6,33 @@ from __future__ import annotations
 import asyncio
 import functools
 import os
+import secrets
+import time
+import uuid
 
-import weaviate
+
+def _uuid7() -> str:
+    """Time-ordered UUIDv7 (RFC 9562) so new objects land next to each other.
+
+    48-bit Unix ms timestamp, version 7, variant 0b10, 74 random bits.
+    """
+    value = (time.time_ns() // 1_000_000) << 80
+    value |= 0x7 << 76 | secrets.randbits(12) << 64
+    value |= 0b10 << 62 | secrets.randbits(62)
+    return str(uuid.UUID(int=value))
 
 
 class WeaviateMemory:
     """Store events in a Weaviate collection."""
 
     def __init__(self, url: str | None = None):
+        try:
+            import weaviate  # deferred so MEM_BACKEND=none never pays for it
+        except ImportError as exc:
+            raise RuntimeError(
+                "MEM_BACKEND=weaviate requires the 'weaviate-client' package"
+            ) from exc
+
         url = url or os.getenv("WEAVIATE_URL", "http://localhost:6666")
         # v3 client – simple REST endpoint, no gRPC
         self._client = weaviate.Client(url)
@@ -36,8 +55,8 @@ class WeaviateMemory:
             except Exception:
                 pass
 
-    async def write(self, event: dict):
-        loop = asyncio.get_running_loop()
+    @staticmethod
+    def _normalize(event: dict) -> dict:
         # Ensure timestamp matches RFC 3339 if schema expects "date"
         if isinstance(event.get("timestamp"), (int, float)):
             from datetime import datetime, timezone
@@ -45,19 +64,63 @@ class WeaviateMemory:
             event["timestamp"] = datetime.fromtimestamp(
                 event["timestamp"], tz=timezone.utc
             ).isoformat(timespec="milliseconds")
+        return event
 
+    async def write(self, event: dict):
+        loop = asyncio.get_running_loop()
         await loop.run_in_executor(
             None,
             functools.partial(
                 self._client.data_object.create,
-                data_object=event,
+                data_object=self._normalize(event),
                 class_name="MemoryEvent",
+                uuid=_uuid7(),
             ),
         )
 
+    def _create_many(self, events: list[dict]) -> None:
+        errors: list = []
+
+        def collect(results: list[dict] | None) -> None:
+            # The client's default callback only prints per-object failures
+            for result in results or ():
+                err = (result.get("result") or {}).get("errors")
+                if err:
+                    errors.append(err)
+
+        # Manual mode: nothing is sent until the single flush on exit
+        with self._client.batch(
+            batch_size=None, dynamic=False, callback=collect
+        ) as batch:
+            for event in events:
+                batch.add_data_object(event, "MemoryEvent", uuid=_uuid7())
+        if errors:
+            raise RuntimeError(
+                f"{len(errors)} of {len(events)} MemoryEvent inserts failed: "
+                f"{errors[0]}"
+            )
+
+    async def write_many(self, events: list[dict]):
+        """Store *events* with a single batch request."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, self._create_many, [self._normalize(e) for e in events]
+        )
+
 
 # Retain module level helper for backwards compatibility
+_default: WeaviateMemory | None = None
+
+
+def _get_default() -> WeaviateMemory:
+    """Build the default instance once; the constructor hits the schema API."""
+    global _default
+    if _default is None:
+        _default = WeaviateMemory()
+    return _default
+
+
 async def write(event: dict) -> None:
-    """Write using a default ``WeaviateMemory`` instance."""
+    """Write using the shared default ``WeaviateMemory`` instance."""
 
-    await WeaviateMemory().write(event)
+    await _get_default().write(event)
@@ -2,26 +2,133 @@
 Stateless JWT authentication middleware.
 
 This file *must* live inside the project's `middleware/` package so that
-`from middleware.auth import jwt_auth_mw` works.
+`from middleware.auth import JwtAuthMiddleware` works.
 """
+
 from __future__ import annotations
 
+import asyncio
+import functools
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
 
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from auth.oidc import verify_jwt, verify_jwt_with_exchange  # your existing verifier (RS256 / ES256 only)
+from auth.oidc import (  # your existing verifier (RS256 / ES256 only)
+    _cached_claims,
+    _token_digest,
+    verify_jwt,
+    verify_jwt_with_exchange,
+)
 
 _CLOCK_SKEW = 60  # seconds
 
-# Paths that don't require authentication
-EXCLUDED_PATHS = {
-    "/auth/config",
-    "/docs",
-    "/redoc",
-    "/openapi.json",
-}
+# Signature checks on a claims-cache miss run here instead of on the event
+# loop; `cryptography` releases the GIL during RSA/ECDSA verification.
+_VERIFY_POOL: ThreadPoolExecutor | None = None
+
+# Paths that don't require authentication (also skipped by the session middleware)
+EXCLUDED_PATHS = frozenset(
+    {
+        "/auth/config",
+        "/docs",
+        "/redoc",
+        "/openapi.json",
+    }
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _descope_exchange_enabled() -> bool:
+    # Read once, on the first request (i.e. after `create_app` loaded .env)
+    return os.getenv("ENABLE_DESCOPE_EXCHANGE", "false").lower() == "true"
+
+
+def _verify_pool() -> ThreadPoolExecutor:
+    """Return the signature-check pool, creating it on first use."""
+    global _VERIFY_POOL
+    if _VERIFY_POOL is None:
+        _VERIFY_POOL = ThreadPoolExecutor(
+            max_workers=os.cpu_count(), thread_name_prefix="jwt-verify"
+        )
+    return _VERIFY_POOL
+
+
+def shutdown_verify_pool() -> None:
+    """Stop the signature-check pool; called from the app lifespan."""
+    global _VERIFY_POOL
+    if _VERIFY_POOL is not None:
+        _VERIFY_POOL.shutdown(wait=False)
+        _VERIFY_POOL = None
+
+
+async def _verify_token(token: str) -> dict[str, Any]:
+    """Return the verified claims for a raw bearer *token*."""
+    # Use sync version unless Descope exchange is explicitly enabled
+    if _descope_exchange_enabled():
+        return await verify_jwt_with_exchange(token, leeway=_CLOCK_SKEW)
+
+    # Cache hits (and cached rejections) are answered inline
+    claims = _cached_claims(_token_digest(token))
+    if claims is not None:
+        return claims
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(  # original sync version, off the loop
+        _verify_pool(), functools.partial(verify_jwt, token, leeway=_CLOCK_SKEW)
+    )
+
+
+async def _verify_bearer(auth_header: str) -> dict[str, Any]:
+    """Return the verified claims for an `Authorization` header value."""
+    if not auth_header.startswith("Bearer "):
+        raise ValueError("Missing Bearer token")
+    return await _verify_token(auth_header.split(" ", 1)[1])
+
+
+class JwtAuthMiddleware:
+    """
+    Pure ASGI version of `jwt_auth_mw`.
+
+    Same behaviour, but it reads the header straight from the scope and
+    calls the downstream app directly, avoiding the extra task and memory
+    stream `BaseHTTPMiddleware` sets up for every request.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"  # CORS preflight
+            or scope["path"] in EXCLUDED_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        # Scan the raw header pairs; only the token itself is ever decoded
+        token = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                if value.startswith(b"Bearer "):
+                    token = value[7:].decode("latin-1")
+                break
+
+        try:
+            if token is None:
+                raise ValueError("Missing Bearer token")
+            claims = await _verify_token(token)
+        except Exception as exc:
+            response = JSONResponse(status_code=401, content={"detail": str(exc)})
+            await response(scope, receive, send)
+            return
+
+        # attach the user id (sub) for the session-middleware (request.state.sub)
+        scope.setdefault("state", {})["sub"] = claims["sub"]
+        await self.app(scope, receive, send)
 
 
 async def jwt_auth_mw(request: Request, call_next):
@@ -31,27 +138,19 @@ async def jwt_auth_mw(request: Request, call_next):
     • Stores the `sub` claim in `request.state.sub` for downstream middleware.
     • Rejects the request with 401 on any failure.
     • Skips authentication for excluded paths and OPTIONS requests.
+
+    Kept for `BaseHTTPMiddleware` users; the gateway installs `JwtAuthMiddleware`.
     """
     # Skip authentication for OPTIONS requests (CORS preflight)
     if request.method == "OPTIONS":
         return await call_next(request)
-    
+
     # Skip authentication for excluded paths
     if request.url.path in EXCLUDED_PATHS:
         return await call_next(request)
 
-    auth_header = request.headers.get("authorization", "")
-    if not auth_header.startswith("Bearer "):
-        return JSONResponse(status_code=401, content={"detail": "Missing Bearer token"})
-
-    token = auth_header.split(" ", 1)[1]
-
     try:
-        # Use sync version unless Descope exchange is explicitly enabled
-        if os.getenv("ENABLE_DESCOPE_EXCHANGE", "false").lower() == "true":
-            claims = await verify_jwt_with_exchange(token, leeway=_CLOCK_SKEW) 
-        else:
-            claims = verify_jwt(token, leeway=_CLOCK_SKEW)  # original sync version
+        claims = await _verify_bearer(request.headers.get("authorization", ""))
     except Exception as exc:
         return JSONResponse(status_code=401, content={"detail": str(exc)})
 
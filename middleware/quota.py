@@ -7,10 +7,8 @@ import logging
 import os
 import time
 from collections import deque
+from functools import lru_cache
 from typing import (
-    AsyncIterator,
-    Awaitable,
-    Callable,
     Deque,
     Dict,
     Iterable,
@@ -20,8 +18,9 @@ from typing import (
 from uuid import uuid4
 
 from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse, StreamingResponse
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # ─────────────────────────────────────────────────────────
 # Tokenizer setup
@@ -34,7 +33,7 @@ except Exception:  # pragma: no cover
 # ≈ cl100k_base: ~4 bytes / token for typical English
 _APPROX_BYTES_PER_TOKEN = 4
 
-from usage.backends import NullUsageBackend
+from usage.backends import NULL_BACKEND, NullUsageBackend
 from utils.env import int_env
 
 logger = logging.getLogger(__name__)
@@ -59,27 +58,67 @@ class InMemoryMeterStore:
     def __init__(self, window: int = 60) -> None:
         self.window = window
         self._data: Dict[str, Deque[Tuple[float, int]]] = {}
+        # Running sum of each user's deque, kept in step on append/evict
+        self._totals: Dict[str, int] = {}
 
-    async def increment(self, user: str, tokens: int) -> Tuple[int, float]:
-        now = time.time()
+    def _evict(self, user: str, now: float) -> Deque[Tuple[float, int]]:
         dq = self._data.setdefault(user, deque())
-        dq.append((now, tokens))
         cutoff = now - self.window
+        total = self._totals.get(user, 0)
         while dq and dq[0][0] < cutoff:
-            dq.popleft()
-        total = sum(t for _, t in dq)
-        oldest = dq[0][0] if dq else now
-        return total, oldest
+            total -= dq.popleft()[1]
+        self._totals[user] = total
+        return dq
+
+    async def increment(self, user: str, tokens: int) -> Tuple[int, float]:
+        now = time.time()
+        dq = self._evict(user, now)
+        dq.append((now, tokens))
+        total = self._totals[user] = self._totals[user] + tokens
+        return total, dq[0][0]
 
     async def adjust(self, user: str, delta: int) -> Tuple[int, float]:
         return await self.increment(user, delta)
 
     async def peek_total(self, user: str) -> int:
-        total, _ = await self.increment(user, 0)
-        dq = self._data.get(user)
-        if total and dq:
-            dq.pop()
-        return total
+        self._evict(user, time.time())
+        return self._totals[user]
+
+
+# Sliding-window update in one round trip. KEYS: zset of "<ts>:<tokens>:<nonce>"
+# members, running total. ARGV: now, member ('' = read only), cutoff, tokens, ttl.
+# Entries leaving the window are subtracted from the total as they are
+# trimmed; a missing total (first use / expired) is rebuilt from the zset.
+_RECORD_LUA = """
+local zkey, skey = KEYS[1], KEYS[2]
+local now, member, cutoff, ttl = ARGV[1], ARGV[2], ARGV[3], ARGV[5]
+local function tok(m) return tonumber(string.match(m, '^[^:]*:(-?%d+)')) or 0 end
+
+local total = redis.call('GET', skey)
+if total then
+  total = tonumber(total)
+  for _, m in ipairs(redis.call('ZRANGEBYSCORE', zkey, '-inf', cutoff)) do
+    total = total - tok(m)
+  end
+  redis.call('ZREMRANGEBYSCORE', zkey, '-inf', cutoff)
+else
+  redis.call('ZREMRANGEBYSCORE', zkey, '-inf', cutoff)
+  total = 0
+  for _, m in ipairs(redis.call('ZRANGE', zkey, 0, -1)) do
+    total = total + tok(m)
+  end
+end
+
+if member ~= '' then
+  redis.call('ZADD', zkey, now, member)
+  total = total + tonumber(ARGV[4])
+end
+redis.call('SET', skey, total, 'EX', ttl)
+redis.call('EXPIRE', zkey, ttl)
+
+local oldest = redis.call('ZRANGE', zkey, 0, 0, 'WITHSCORES')
+return {total, oldest[2] or now}
+"""
 
 
 class RedisMeterStore:
@@ -90,110 +129,106 @@ class RedisMeterStore:
 
         self.window = window
         self.redis = redis.from_url(url, decode_responses=True)
+        # EVALSHA with automatic script (re)load on NOSCRIPT
+        self._record_script = self.redis.register_script(_RECORD_LUA)
 
-    async def increment(self, user: str, tokens: int) -> Tuple[int, float]:
+    async def _record(
+        self, user: str, tokens: int, *, add: bool = True
+    ) -> Tuple[int, float]:
         now = time.time()
         key = f"attach:quota:{user}"
-        member = f"{now}:{tokens}"
-        async with self.redis.pipeline(transaction=True) as pipe:
-            await pipe.zadd(key, {member: now})
-            await pipe.zremrangebyscore(key, 0, now - self.window)
-            await pipe.zrange(key, 0, -1, withscores=True)
-            results = await pipe.execute()
-        entries = results[-1]
-        total = 0
-        oldest = now
-        for m, ts in entries:
-            try:
-                _, tok = m.split(":", 1)
-                total += int(tok)
-            except Exception:
-                pass
-            oldest = min(oldest, ts)
-        return total, oldest
+        # The nonce keeps concurrent entries with equal ts/tokens distinct
+        member = f"{now}:{tokens}:{uuid4().hex[:8]}" if add else ""
+        total, oldest = await self._record_script(
+            keys=[key, f"{key}:sum"],
+            args=[now, member, now - self.window, tokens, self.window],
+        )
+        return int(total), float(oldest)
+
+    async def increment(self, user: str, tokens: int) -> Tuple[int, float]:
+        return await self._record(user, tokens)
 
     async def adjust(self, user: str, delta: int) -> Tuple[int, float]:
-        now = time.time()
-        key = f"attach:quota:{user}"
-        member = f"{now}:{delta}"
-        async with self.redis.pipeline(transaction=True) as pipe:
-            await pipe.zadd(key, {member: now})
-            await pipe.zremrangebyscore(key, 0, now - self.window)
-            await pipe.zrange(key, 0, -1, withscores=True)
-            results = await pipe.execute()
-        entries = results[-1]
-        total = 0
-        oldest = now
-        for m, ts in entries:
-            try:
-                _, tok = m.split(":", 1)
-                total += int(tok)
-            except Exception:
-                pass
-            oldest = min(oldest, ts)
-        return total, oldest
+        return await self._record(user, delta)
 
     async def peek_total(self, user: str) -> int:
-        now = time.time()
-        key = f"attach:quota:{user}"
-        member = f"{now}:0:{uuid4().hex}"
-        async with self.redis.pipeline(transaction=True) as pipe:
-            await pipe.zadd(key, {member: now})
-            await pipe.zremrangebyscore(key, 0, now - self.window)
-            await pipe.zrange(key, 0, -1, withscores=True)
-            pipe.zrem(key, member)
-            results = await pipe.execute()
-        entries = results[2]
-        total = 0
-        for m, _ in entries:
-            try:
-                _, tok = m.split(":", 1)
-                total += int(tok)
-            except Exception:
-                pass
+        total, _ = await self._record(user, 0, add=False)
         return total
 
 
+_TEXTUAL_TYPES = frozenset(
+    {"application/json", "application/x-ndjson", "application/jsonl"}
+)
+
+
 def _is_textual(mime: str) -> bool:
-    mime = (mime or "").lower()
+    mime = (mime or "").split(";", 1)[0].strip().lower()
     if not mime or mime == "*/*":
         return False
-    return mime.startswith("text/") or "json" in mime
+    return mime.startswith("text/") or mime in _TEXTUAL_TYPES or mime.endswith("+json")
 
 
 # ---------------------------------------------------------------------------
 # Token-count helpers
 # ---------------------------------------------------------------------------
 
-def _encoder_for_model(model: str):
-    """Return a tiktoken encoder, falling back to byte count."""
-    if tiktoken is None:  # fallback: 1 token ≈ 4 bytes
 
-        class _Approx:
-            def encode(self, text: str) -> list[int]:
-                # Never return 0 → always count at least 1 token
-                return [0] * max(1, len(text) // _APPROX_BYTES_PER_TOKEN)
+class _Approx:
+    """Byte-count stand-in for a tiktoken encoder (1 token ≈ 4 bytes)."""
+
+    def encode(self, text: str) -> list[int]:
+        # Never return 0 → always count at least 1 token
+        return [0] * max(1, len(text) // _APPROX_BYTES_PER_TOKEN)
+
 
-        return _Approx()
+_APPROX = _Approx()
+
+
+@lru_cache(maxsize=16)
+def _encoder_for_model(model: str):
+    """Return a tiktoken encoder, falling back to byte count.
+
+    Cached per model name, so every middleware instance and every chunk
+    shares one encoder instead of resolving it again.
+    """
+    if tiktoken is None:
+        return _APPROX
 
     try:
-        return tiktoken.encoding_for_model(model)
+        enc = tiktoken.encoding_for_model(model)
     except Exception:
         try:
-            return tiktoken.get_encoding("cl100k_base")
+            enc = tiktoken.get_encoding("cl100k_base")
         except Exception:
-
-            class _Approx:
-                def encode(self, text: str) -> list[int]:
-                    return [0] * max(1, len(text) // _APPROX_BYTES_PER_TOKEN)
-
-            return _Approx()
+            return _APPROX
+    enc.encode("")  # warm up the regex / BPE tables
+    return enc
 
 
 def _num_tokens(text: str, model: str = "cl100k_base") -> int:
+    if not text or text.isspace():  # e.g. SSE keep-alive frames
+        return 0
     return len(_encoder_for_model(model).encode(text))
 
 
+def _num_tokens_batch(texts: list[str], model: str = "cl100k_base") -> list[int]:
+    """Token counts for several texts in one call (parallel in tiktoken's Rust core)."""
+    counts = [0] * len(texts)
+    # Blank texts (e.g. SSE keep-alive frames) count 0 and skip the encoder
+    todo = [i for i, t in enumerate(texts) if t and not t.isspace()]
+    if not todo:
+        return counts
+    enc = _encoder_for_model(model)
+    if hasattr(enc, "encode_batch"):
+        tokens = enc.encode_batch([texts[i] for i in todo], disallowed_special=())
+        for i, toks in zip(todo, tokens):
+            counts[i] = len(toks)
+    else:
+        for i in todo:
+            counts[i] = len(enc.encode(texts[i]))
+    return counts
+
+
 def num_tokens_from_messages(messages: Iterable[dict], model: str) -> int:
     enc = _encoder_for_model(model)
     total = 3
@@ -206,12 +241,8 @@ def num_tokens_from_messages(messages: Iterable[dict], model: str) -> int:
     return total
 
 
-async def async_iter(data: Iterable[bytes]) -> AsyncIterator[bytes]:
-    for chunk in data:
-        yield chunk
-
-
-_SKIP_PATHS = {
+# Prefixes as a tuple so a single str.startswith call checks them all
+_SKIP_PATHS = (
     "/metrics",
     "/mem/events",
     "/auth/config",
@@ -219,14 +250,18 @@ _SKIP_PATHS = {
     "/docs",
     "/redoc",
     "/openapi.json",
-}
+)
+
 
+class _QuotaExceeded(Exception):
+    """Raised from the metering ``send`` to stop the app mid-stream."""
 
-class TokenQuotaMiddleware(BaseHTTPMiddleware):
-    """Apply per-user LLM token quotas."""
 
-    def __init__(self, app, store: AbstractMeterStore | None = None) -> None:
-        super().__init__(app)
+class TokenQuotaMiddleware:
+    """Apply per-user LLM token quotas (pure ASGI)."""
+
+    def __init__(self, app: ASGIApp, store: AbstractMeterStore | None = None) -> None:
+        self.app = app
         self.window = int(os.getenv("WINDOW", "60"))
         self.max_tokens: int | None = int_env("MAX_TOKENS_PER_MIN", 60000)
         if store is not None:
@@ -240,128 +275,120 @@ class TokenQuotaMiddleware(BaseHTTPMiddleware):
             )
 
     class _Streamer:
+        """Meters response chunks as they are pushed through."""
+
         def __init__(
             self,
-            iterator: AsyncIterator[bytes],
             *,
             user: str,
             store: AbstractMeterStore,
             max_tokens: int | None,
             is_textual: bool,
+            spent: int = 0,
         ) -> None:
-            self.iterator = iterator
             self.tail = bytearray()
-            self.on_complete: Callable[[], Awaitable[None]] | None = None
             self.user = user
             self.store = store
             self.limit = max_tokens
+            self.remaining = (max_tokens or 0) - spent
             self.is_textual = is_textual
             self.quota_exceeded = False
+            # Every token spans at least one byte, so while the byte length of
+            # the unmetered chunks fits the remaining budget no chunk can breach
+            # the quota and tokenisation can wait. Deferred chunks are counted
+            # together once the bound gets tight, or when the stream ends.
+            self._deferred: list[bytes] = []
+            self._budget = self.remaining
+
+        async def push(self, chunk: bytes) -> None:
+            if self.quota_exceeded:
+                return
+            self.tail.extend(chunk)
+            if len(self.tail) > 8192:
+                del self.tail[:-8192]
+            if not (self.limit and self.is_textual):
+                return
+            self._deferred.append(chunk)
+            self._budget -= len(chunk)
+            if self._budget < 0:
+                await self._meter(self._deferred)
+                self._deferred = []
+                self._budget = self.remaining
+
+        async def close(self) -> None:
+            if self._deferred and not self.quota_exceeded:
+                await self._meter(self._deferred)
+            self._deferred = []
+
+        async def _meter(self, chunks: list[bytes]) -> None:
+            """Charge *chunks* with one tokenizer call and one store update.
+
+            On a breach the breaching chunk and everything after it are rolled
+            back, exactly as if they had been charged one by one.
+            """
+            counts = _num_tokens_batch([c.decode("utf-8", "ignore") for c in chunks])
+            charged = sum(counts)
+            if not charged:
+                return
+            total, _ = await self.store.adjust(self.user, charged)
+            self.remaining = self.limit - total
+            if total <= self.limit:
+                return
 
-        def __aiter__(self) -> AsyncIterator[bytes]:
-            return self._gen()
-
-        async def _gen(self) -> AsyncIterator[bytes]:
-            try:
-                async for chunk in self.iterator:
-                    self.tail.extend(chunk)
-                    if len(self.tail) > 8192:
-                        del self.tail[:-8192]
-                    if self.limit:
-                        chunk_tokens = (
-                            _num_tokens(chunk.decode("utf-8", "ignore"))
-                            if self.is_textual
-                            else 0
-                        )
-                        if chunk_tokens:
-                            total, _ = await self.store.adjust(self.user, chunk_tokens)
-                            if total > self.limit:
-                                await self.store.adjust(self.user, -chunk_tokens)
-                                self.quota_exceeded = True
-                                logger.warning(
-                                    "User %s quota breached mid-stream", self.user
-                                )
-                                return
-                    yield chunk
-            finally:
-                if self.on_complete:
-                    await self.on_complete()
+            running = total - charged
+            for count in counts:
+                running += count
+                if running > self.limit:
+                    break
+            await self.store.adjust(self.user, -(total - (running - count)))
+            self.quota_exceeded = True
+            logger.warning("User %s quota breached mid-stream", self.user)
 
         def get_tail(self) -> bytes:
             return bytes(self.tail)
 
-    class _BufferedResponse(StreamingResponse):
-        def __init__(
-            self, streamer: "TokenQuotaMiddleware._Streamer", **kwargs
-        ) -> None:
-            super().__init__(streamer, **kwargs)
-            self._streamer = streamer
-
-        async def stream_response(self, send):
-            chunks: list[bytes] = []
-            async for chunk in self._streamer:
-                chunks.append(chunk)
-            if getattr(self._streamer, "quota_exceeded", False):
-                retry_after = max(
-                    0,
-                    int(
-                        self._streamer.window
-                        - (time.time() - getattr(self._streamer, "oldest", 0))
-                    ),
-                )
-                self.status_code = 429
-                self.raw_headers = [
-                    (b"content-type", b"application/json"),
-                    (b"retry-after", str(retry_after).encode()),
-                ]
-                iterator = async_iter(
-                    [
-                        json.dumps(
-                            {
-                                "detail": "token quota exceeded",
-                                "retry_after": retry_after,
-                            }
-                        ).encode()
-                    ]
-                )
-            else:
-                iterator = async_iter(chunks)
-            await send(
-                {
-                    "type": "http.response.start",
-                    "status": self.status_code,
-                    "headers": self.raw_headers,
-                }
-            )
-            async for chunk in iterator:
-                if not isinstance(chunk, (bytes, memoryview)):
-                    chunk = chunk.encode(self.charset)
-                await send(
-                    {"type": "http.response.body", "body": chunk, "more_body": True}
-                )
-            await send({"type": "http.response.body", "body": b"", "more_body": False})
-
-    async def dispatch(self, request: Request, call_next):
-        if any(request.url.path.startswith(p) for p in _SKIP_PATHS):
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(_SKIP_PATHS):
+            await self.app(scope, receive, send)
+            return
 
+        request = Request(scope, receive)
         if not hasattr(request.app.state, "usage"):
-            request.app.state.usage = NullUsageBackend()
+            request.app.state.usage = NULL_BACKEND
+        # Default backend: skip the no-op coroutine on every request
+        backend = request.app.state.usage
+        record_usage = None if isinstance(backend, NullUsageBackend) else backend.record
 
         # ── OPTIONAL request-size guard (default 1 MB) ───────────────
         max_bytes = int(os.getenv("MAX_REQUEST_BYTES", "1000000"))
-        raw = await request.body()
-        if len(raw) > max_bytes:
-            return JSONResponse(
-                {
-                    "detail": "request too large",
-                    "limit_bytes": max_bytes,
-                },
-                status_code=413,
-            )
+        too_large = JSONResponse(
+            {
+                "detail": "request too large",
+                "limit_bytes": max_bytes,
+            },
+            status_code=413,
+        )
+        declared = request.headers.get("content-length", "")
+        if declared.isdigit() and int(declared) > max_bytes:
+            await too_large(scope, receive, send)
+            return
 
-        # Re-use the already-read body from here on
-        request._body = raw
+        req_is_text = _is_textual(request.headers.get("content-type", ""))
+        raw: bytes | None = None
+        # A non-textual body is never tokenised; once its declared size has
+        # passed the guard it goes to the app without being buffered here
+        if req_is_text or not declared.isdigit():
+            # Read chunk by chunk so an oversized body is rejected before it
+            # is buffered in full
+            parts: list[bytes] = []
+            size = 0
+            async for part in request.stream():
+                size += len(part)
+                if size > max_bytes:
+                    await too_large(scope, receive, send)
+                    return
+                parts.append(part)
+            raw = b"".join(parts)
 
         # Fix: Get user from request.state.sub (set by auth middleware)
         user = getattr(request.state, "sub", None) or (
@@ -376,10 +403,9 @@ class TokenQuotaMiddleware(BaseHTTPMiddleware):
             "model": "unknown",
             "request_id": request.headers.get("x-request-id") or str(uuid4()),
         }
-        req_is_text = _is_textual(request.headers.get("content-type", ""))
 
         tokens_in = 0
-        if req_is_text:
+        if req_is_text and raw is not None:
             # raw already read above
             try:
                 payload = json.loads(raw.decode())
@@ -399,43 +425,73 @@ class TokenQuotaMiddleware(BaseHTTPMiddleware):
             await self.store.adjust(user, -tokens_in)
             retry_after = max(0, int(self.window - (time.time() - oldest)))
             usage["ts"] = time.time()
-            await request.app.state.usage.record(**usage)
-            return JSONResponse(
+            if record_usage is not None:
+                await record_usage(**usage)
+            response = JSONResponse(
                 {"detail": "token quota exceeded", "retry_after": retry_after},
                 status_code=429,
             )
+            await response(scope, receive, send)
+            return
 
-        resp = await call_next(request)
+        # Re-use the already-read body from here on
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": raw, "more_body": False}
+            return await receive()
+
+        start: Message = {}
+        chunks: list[bytes] = []
+        streamer: TokenQuotaMiddleware._Streamer | None = None
+
+        async def meter_send(message: Message) -> None:
+            nonlocal start, streamer
+            if message["type"] == "http.response.start":
+                start = message
+                media = MutableHeaders(scope=start).get("content-type", "")
+                streamer = self._Streamer(
+                    user=user,
+                    store=self.store,
+                    max_tokens=self.max_tokens,
+                    is_textual=_is_textual(media),
+                    spent=total,
+                )
+            elif message["type"] == "http.response.body" and streamer is not None:
+                chunk = message.get("body", b"")
+                if chunk:
+                    await streamer.push(chunk)
+                    chunks.append(chunk)
+                if not message.get("more_body", False):
+                    await streamer.close()
+                if streamer.quota_exceeded:
+                    # Unwind the app so the upstream generator stops producing
+                    raise _QuotaExceeded
+                if not message.get("more_body", False):
+                    await finalize(streamer)
+            else:
+                await send(message)
 
-        media = resp.media_type or resp.headers.get("content-type", "")
-        resp_is_text = _is_textual(media)
-        streamer = self._Streamer(
-            resp.body_iterator,
-            user=user,
-            store=self.store,
-            max_tokens=self.max_tokens,
-            is_textual=resp_is_text,
-        )
-        streamer.window = self.window
-        streamer.oldest = oldest
-
-        headers = dict(resp.headers)
-        headers.pop("content-length", None)
-        response = self._BufferedResponse(
-            streamer,
-            status_code=resp.status_code,
-            headers=headers,
-            media_type=resp.media_type,
-        )
+        async def reject_midstream() -> None:
+            usage["detail"] = "token quota exceeded mid-stream"
+            retry_after = max(0, int(self.window - (time.time() - oldest)))
+            usage["ts"] = time.time()
+            if record_usage is not None:
+                await record_usage(**usage)
+            response = JSONResponse(
+                {"detail": "token quota exceeded", "retry_after": retry_after},
+                status_code=429,
+                headers={"retry-after": str(retry_after)},
+            )
+            await response(scope, receive, send)
 
-        async def finalize() -> None:
-            nonlocal tokens_in, oldest
-            if getattr(streamer, "quota_exceeded", False):
-                usage["detail"] = "token quota exceeded mid-stream"
-                retry_after = max(0, int(self.window - (time.time() - oldest)))
-                usage["ts"] = time.time()
-                await request.app.state.usage.record(**usage)
-                return
+        async def finalize(streamer: TokenQuotaMiddleware._Streamer) -> None:
+            nonlocal tokens_in
+            headers = MutableHeaders(scope=start)
+            resp_is_text = streamer.is_textual
             tokens_out = 0
             model = usage.get("model", "unknown")
             parsed: dict | None = None
@@ -461,8 +517,8 @@ class TokenQuotaMiddleware(BaseHTTPMiddleware):
                     model = parsed.get("model", model)
                     if "usage" in parsed:
                         u = parsed.get("usage") or {}
-                        tokens_out = int(u.get("completion_tokens", 0))
-                        prompt_tokens = int(u.get("prompt_tokens", tokens_in))
+                        tokens_out = int(u.get("completion_tokens") or 0)
+                        prompt_tokens = int(u.get("prompt_tokens") or tokens_in)
                         delta_prompt = prompt_tokens - tokens_in  # adjust quota window
                         tokens_in = prompt_tokens  # ← canonical value
                         usage["tokens_in"] = tokens_in
@@ -488,12 +544,12 @@ class TokenQuotaMiddleware(BaseHTTPMiddleware):
             total = await self.store.peek_total(user)
             if self.max_tokens is not None and total > self.max_tokens:
                 retry_after = self.window  # simple worst-case
-                response.status_code = 429
-                response.headers["Retry-After"] = str(retry_after)
+                start["status"] = 429
+                headers["Retry-After"] = str(retry_after)
                 usage["detail"] = "token quota exceeded post-stream"
-                response.headers["content-type"] = "application/json"
+                headers["content-type"] = "application/json"
 
-            response.headers.update(
+            headers.update(
                 {
                     "x-llm-model": model,
                     "x-tokens-in": str(tokens_in),
@@ -502,8 +558,23 @@ class TokenQuotaMiddleware(BaseHTTPMiddleware):
             )
 
             usage["ts"] = time.time()
-            await request.app.state.usage.record(**usage)
+            if record_usage is not None:
+                await record_usage(**usage)
             logger.info(json.dumps(usage))
 
-        streamer.on_complete = finalize
-        return response
+            # The response was held back until metered; send it in one go
+            await send(start)
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": b"".join(chunks),
+                    "more_body": False,
+                }
+            )
+
+        try:
+            await self.app(
+                scope, receive if raw is None else replay_receive, meter_send
+            )
+        except _QuotaExceeded:
+            await reject_midstream()
@@ -3,37 +3,95 @@ from __future__ import annotations
 
 import hashlib
 import json
+import logging
+import os
 import time
+from functools import lru_cache
 
 from fastapi import Request, Response
+from starlette.datastructures import MutableHeaders
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from mem import write as mem_write
+from middleware.auth import EXCLUDED_PATHS  # same paths as the auth middleware
 
-# Paths that don't require authentication (same as auth middleware)
-EXCLUDED_PATHS = {
-    "/auth/config",
-    "/docs",
-    "/redoc",
-    "/openapi.json",
-}
+log = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=1)
+def _session_key() -> bytes:
+    # Read once, on the first request (i.e. after `create_app` loaded .env), so
+    # every cached and uncached session id is keyed the same way
+    key = os.getenv("SESSION_SECRET", "").encode()[:64]
+    if not key:
+        log.warning(
+            "SESSION_SECRET is not set; session ids are an unkeyed hash of "
+            "sub and User-Agent and can be recomputed by anyone who knows both"
+        )
+    return key
+
+
+@lru_cache(maxsize=4096)
 def _session_id(sub: str, user_agent: str) -> str:
-    return hashlib.sha256(f"{sub}:{user_agent}".encode()).hexdigest()
+    # Repeat clients hit the cache; SESSION_SECRET (if set) keys the hash so
+    # session ids can't be recomputed from a known sub and User-Agent.
+    return hashlib.blake2b(
+        f"{sub}:{user_agent}".encode(), digest_size=32, key=_session_key()
+    ).hexdigest()
+
+
+class SessionMiddleware:
+    """
+    Pure ASGI version of `session_mw`.
+
+    The session headers are added to the `http.response.start` message, i.e.
+    once the inner app (and the auth middleware) has set `state["sub"]`.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_session(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                state = scope.get("state", {})
+                sub = state.get("sub")
+                if sub is not None:
+                    user_agent = next(
+                        (
+                            v.decode("latin-1")
+                            for k, v in scope["headers"]
+                            if k == b"user-agent"
+                        ),
+                        "",
+                    )
+                    sid = _session_id(sub, user_agent)
+                    state["sid"] = sid
+                    headers = MutableHeaders(scope=message)
+                    headers["X-Attach-Session"] = sid[:16]  # expose *truncated* sid
+                    headers["X-Attach-User"] = sub[:32]
+            await send(message)
+
+        await self.app(scope, receive, send_with_session)
 
 
 async def session_mw(request: Request, call_next):
     # Skip session middleware for excluded paths
     if request.url.path in EXCLUDED_PATHS:
         return await call_next(request)
-    
+
     # Let the auth middleware handle authentication first
     response: Response = await call_next(request)
-    
+
     # Only set session ID if sub is available (after auth middleware runs)
     if hasattr(request.state, "sub"):
         sid = _session_id(request.state.sub, request.headers.get("user-agent", ""))
         request.state.sid = sid  # expose to downstream handlers
         response.headers["X-Attach-Session"] = sid[:16]  # expose *truncated* sid
-        response.headers["X-Attach-User"]    = request.state.sub[:32]
-    return response
\ No newline at end of file
+        response.headers["X-Attach-User"] = request.state.sub[:32]
+    return response
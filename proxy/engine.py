@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 from typing import Any, AsyncIterator
 
 import httpx
@@ -9,8 +10,35 @@ from starlette.responses import StreamingResponse
 
 router = APIRouter()
 
+# Streams may run for minutes, so reads are unbounded; waiting for a free
+# connection is not, so a saturated pool fails instead of hanging.
+_ENGINE_TIMEOUT = httpx.Timeout(None, pool=10.0)
+
+
+def engine_client() -> httpx.AsyncClient:
+    """
+    Return a new pooled client for `/api/chat` streams.
+
+    The lifespan keeps it on `app.state.engine_http`, apart from
+    `app.state.http`: A2A forwards default to this gateway's own `/api/chat`,
+    so sharing one pool would let busy A2A tasks starve the streams they
+    wait on.
+    """
+    return httpx.AsyncClient(
+        timeout=_ENGINE_TIMEOUT,
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+    )
+
+
+@lru_cache(maxsize=1)
+def _upstream_url() -> str:
+    # Resolved on the first request, i.e. after `create_app` loaded .env
+    base = os.getenv("ENGINE_URL", "http://localhost:11434").rstrip("/")
+    return f"{base}/v1/chat/completions"
+
 
 async def _upstream_stream(
+    client: httpx.AsyncClient | None,
     method: str,
     url: str,
     *,
@@ -21,19 +49,34 @@ async def _upstream_stream(
     Proxy the request to the chat engine and yield its bytes **as-they-arrive**.
 
     We keep memory usage constant by forwarding the async byte-stream instead of
-    buffering the full response.
+    buffering the full response. *client* is the pooled `app.state.engine_http`
+    when the gateway lifespan created one, so upstream connections are reused.
     """
-    async with httpx.AsyncClient(timeout=None) as client:
-        async with client.stream(
-            method,
-            url,
-            headers=headers,
-            json=payload,
-            timeout=None,
-        ) as resp:
-            # Propagate non-2xx as JSON later; for now just expose the body.
-            async for chunk in resp.aiter_bytes():
+    if client is None:  # router mounted without the gateway lifespan
+        async with engine_client() as own:
+            async for chunk in _upstream_stream(
+                own, method, url, headers=headers, payload=payload
+            ):
                 yield chunk
+        return
+
+    async with client.stream(
+        method,
+        url,
+        headers=headers,
+        json=payload,
+    ) as resp:
+        # Propagate non-2xx as JSON later; for now just expose the body.
+        # The body is requested uncompressed, so normally there is nothing to
+        # decode and raw chunks are passed on as received. `identity` is only
+        # a preference, though: if the upstream compressed anyway, decode
+        # here, since the Content-Encoding header is not forwarded.
+        if resp.headers.get("content-encoding"):
+            chunks = resp.aiter_bytes()
+        else:
+            chunks = resp.aiter_raw()
+        async for chunk in chunks:
+            yield chunk
 
 
 @router.post("/api/chat")
@@ -49,26 +92,34 @@ async def proxy_to_engine(request: Request):
             detail="Body must be valid JSON",
         )
 
-    base = os.getenv("ENGINE_URL", "http://localhost:11434").rstrip("/")
-    upstream_url = f"{base}/v1/chat/completions"
+    upstream_url = _upstream_url()
 
-    # Pass along Bearer token if present
-    headers: dict[str, str] = {}
+    # Pass along Bearer token if present; ask for an uncompressed body since
+    # it is streamed through without decoding (see `_upstream_stream`)
+    headers: dict[str, str] = {"Accept-Encoding": "identity"}
     if auth := request.headers.get("Authorization"):
         headers["Authorization"] = auth
 
     try:
         return StreamingResponse(
-            _upstream_stream(request.method, upstream_url, headers=headers, payload=body),
+            _upstream_stream(
+                getattr(request.app.state, "engine_http", None),
+                request.method,
+                upstream_url,
+                headers=headers,
+                payload=body,
+            ),
             media_type="application/json",
         )
     except httpx.HTTPStatusError as exc:
         # Bubble the upstream status so callers can act accordingly
-        raise HTTPException(status_code=exc.response.status_code, detail=exc.response.text)
+        raise HTTPException(
+            status_code=exc.response.status_code, detail=exc.response.text
+        )
     except Exception as exc:
         # Log & hide internals from the client
         # (LOGGER omitted for brevity – add one if you like)
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY,
             detail="Upstream chat engine error",
-        ) from exc
\ No newline at end of file
+        ) from exc
@@ -18,7 +18,7 @@ async def test_tasks_send_logs_events(monkeypatch):
     async def fake_write(event):
         events.append(event)
 
-    async def fake_forward_call(body, headers, task_id, sid, sub):
+    async def fake_forward_call(app, body, headers, task_id, sid, sub):
         await fake_write({"event": "task_sent", "task_id": task_id})
         await fake_write({"event": "task_result", "task_id": task_id})
 
@@ -43,3 +43,31 @@ async def test_tasks_send_logs_events(monkeypatch):
     assert events[0]["event"] == "task_sent"
     assert events[1]["event"] == "task_result"
     assert all(e["task_id"] == tid for e in events)
+
+
+@pytest.mark.asyncio
+async def test_task_cap_evicts_oldest_first(monkeypatch):
+    async def fake_forward_call(app, body, headers, task_id, sid, sub):
+        pass
+
+    monkeypatch.setattr("a2a.routes._forward_call", fake_forward_call)
+    monkeypatch.setattr("a2a.routes._MAX_TASKS", 2)
+    _TASKS.clear()
+
+    app = FastAPI()
+    app.include_router(a2a_router, prefix="/a2a")
+
+    headers = {"Authorization": "Bearer t"}
+    body = {"input": {"messages": [{"content": "hi"}]}}
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        tids = []
+        for _ in range(3):
+            resp = await client.post("/a2a/tasks/send", json=body, headers=headers)
+            tids.append(resp.json()["task_id"])
+        evicted = await client.get(f"/a2a/tasks/status/{tids[0]}", headers=headers)
+
+    assert list(_TASKS) == tids[1:]
+    assert evicted.status_code == 404
+    _TASKS.clear()
@@ -1,18 +1,20 @@
 import pytest
-from fastapi import FastAPI, Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import HTTPException
-from httpx import AsyncClient, ASGITransport
+from fastapi import FastAPI, HTTPException, Request
+from httpx import ASGITransport, AsyncClient
 from jose import JWTError
+from starlette.middleware.base import BaseHTTPMiddleware
 
-import auth.oidc 
+import auth.oidc
 from auth.oidc import verify_jwt, verify_jwt_with_exchange
-from middleware.auth import jwt_auth_mw
+from middleware.auth import JwtAuthMiddleware, jwt_auth_mw
 
 # Example of a dummy JWT with three segments
-DUMMY_GOOD_TOKEN = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJzdWIiOiJ0ZXN0LXVzZXIifQ.s3cr3t"
+DUMMY_GOOD_TOKEN = (
+    "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJzdWIiOiJ0ZXN0LXVzZXIifQ.s3cr3t"
+)
 DUMMY_BAD_TOKEN = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.invalid.payload"
 
+
 @pytest.fixture(autouse=True)
 def stub_verify_jwt(monkeypatch):
     """
@@ -20,6 +22,7 @@ def stub_verify_jwt(monkeypatch):
     - returns {"sub": "test-user"} for token "DUMMY_GOOD_TOKEN"
     - raises ValueError for anything else
     """
+
     def fake_verify_sync(token: str, *, leeway: int = 60):
         if token == DUMMY_GOOD_TOKEN:
             return {"sub": "test-user"}
@@ -32,20 +35,25 @@ def stub_verify_jwt(monkeypatch):
 
     monkeypatch.setattr(auth.oidc, "verify_jwt", fake_verify_sync)
     monkeypatch.setattr(auth.oidc, "verify_jwt_with_exchange", fake_verify_async)
-    
+
     import middleware.auth
+
     monkeypatch.setattr(middleware.auth, "verify_jwt", fake_verify_sync)
     monkeypatch.setattr(middleware.auth, "verify_jwt_with_exchange", fake_verify_async)
 
 
-@pytest.fixture
-def app():
+@pytest.fixture(params=["asgi", "dispatch"])
+def app(request):
     """
-    A minimal FastAPI app that installs our JWT middleware
+    A minimal FastAPI app that installs our JWT middleware (either the pure
+    ASGI class or the `BaseHTTPMiddleware` dispatch function)
     and exposes one protected endpoint.
     """
     app = FastAPI()
-    app.add_middleware(BaseHTTPMiddleware, dispatch=jwt_auth_mw)
+    if request.param == "asgi":
+        app.add_middleware(JwtAuthMiddleware)
+    else:
+        app.add_middleware(BaseHTTPMiddleware, dispatch=jwt_auth_mw)
 
     @app.get("/protected")
     async def protected(request: Request):
@@ -81,4 +89,24 @@ async def test_good_token_succeeds_and_sets_sub(app):
     async with AsyncClient(transport=transport, base_url="http://test") as client:
         resp = await client.get("/protected", headers=headers)
     assert resp.status_code == 200
-    assert resp.json().get("sub") == "test-user"
\ No newline at end of file
+    assert resp.json().get("sub") == "test-user"
+
+
+@pytest.mark.asyncio
+async def test_verify_pool_created_lazily_and_shut_down(app):
+    import middleware.auth
+
+    middleware.auth.shutdown_verify_pool()
+    assert middleware.auth._VERIFY_POOL is None
+
+    headers = {"Authorization": f"Bearer {DUMMY_GOOD_TOKEN}"}
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/protected", headers=headers)
+    assert resp.status_code == 200
+    pool = middleware.auth._VERIFY_POOL
+    assert pool is not None
+
+    middleware.auth.shutdown_verify_pool()
+    assert middleware.auth._VERIFY_POOL is None
+    assert pool._shutdown
@@ -1,3 +1,4 @@
+import asyncio
 import importlib
 import sys
 import types
@@ -26,3 +27,116 @@ async def test_init_weaviate_backend(monkeypatch):
     backend = mem._get_backend()
     assert isinstance(backend, DummyMem)
     assert mem._memory is backend
+
+
+@pytest.mark.asyncio
+async def test_write_batches_queued_events(monkeypatch):
+    """mem.write() queues events; one consumer hands them over in a batch."""
+    mem = importlib.import_module("mem")
+    batches = []
+
+    class BatchingMem:
+        async def write(self, event):
+            raise AssertionError("write_many should be preferred")
+
+        async def write_many(self, events):
+            batches.append(list(events))
+
+    monkeypatch.setattr(mem, "_memory", BatchingMem())
+
+    for i in range(3):
+        await mem.write({"n": i})
+    await asyncio.sleep(mem._BATCH_WAIT + 0.1)
+
+    assert batches == [[{"n": 0}, {"n": 1}, {"n": 2}]]
+
+
+@pytest.mark.asyncio
+async def test_aclose_flushes_queue_and_stops_writer(monkeypatch):
+    """mem.aclose() writes everything still queued, then ends the consumer."""
+    mem = importlib.import_module("mem")
+    written = []
+
+    class SlowMem:
+        async def write_many(self, events):
+            await asyncio.sleep(0.05)
+            written.extend(events)
+
+    monkeypatch.setattr(mem, "_memory", SlowMem())
+
+    for i in range(3):
+        await mem.write({"n": i})
+    consumer = mem._consumer
+    await mem.aclose()
+
+    assert written == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert consumer.done()
+    assert mem._consumer is None
+
+
+@pytest.mark.asyncio
+async def test_weaviate_write_many_raises_on_failed_objects():
+    """Per-object batch errors surface as an exception instead of being printed."""
+    from mem.weaviate import WeaviateMemory
+
+    class FakeBatch:
+        def __call__(self, **config):
+            self.config = config
+            return self
+
+        def __enter__(self):
+            self.added = []
+            return self
+
+        def __exit__(self, *exc):
+            self.config["callback"](
+                [
+                    {"result": {"errors": {"error": [{"message": "bad"}]}}},
+                    {"result": {}},
+                ]
+            )
+
+        def add_data_object(self, obj, class_name, uuid=None):
+            self.added.append(obj)
+
+    memory = WeaviateMemory.__new__(WeaviateMemory)
+    memory._client = types.SimpleNamespace(batch=FakeBatch())
+
+    with pytest.raises(RuntimeError, match="1 of 2 MemoryEvent inserts failed"):
+        await memory.write_many([{"n": 0}, {"n": 1}])
+    assert len(memory._client.batch.added) == 2
+
+
+def test_mem_events_client_reports_outage(monkeypatch):
+    """A cached Weaviate client that stops answering yields 503, then reconnects."""
+    from fastapi import FastAPI, HTTPException
+
+    from attach.mem_events import weaviate_client
+
+    ready = {"value": True}
+    built = []
+
+    class FakeClient:
+        def __init__(self, url):
+            built.append(self)
+
+        def is_ready(self):
+            return ready["value"]
+
+    monkeypatch.setitem(
+        sys.modules, "weaviate", types.SimpleNamespace(Client=FakeClient)
+    )
+    app = FastAPI()
+
+    first = weaviate_client(app)
+    assert weaviate_client(app) is first
+
+    ready["value"] = False
+    with pytest.raises(HTTPException) as exc:
+        weaviate_client(app)
+    assert exc.value.status_code == 503
+    assert app.state.weaviate is None
+
+    ready["value"] = True
+    assert weaviate_client(app) is not first
+    assert len(built) == 2
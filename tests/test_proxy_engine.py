@@ -0,0 +1,34 @@
+import gzip
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from proxy.engine import router as proxy_router
+
+
+@pytest.mark.asyncio
+async def test_compressed_upstream_body_is_decoded():
+    """An upstream that ignores Accept-Encoding: identity still yields plain JSON."""
+    body = b'{"choices": []}'
+
+    def upstream(request: httpx.Request) -> httpx.Response:
+        assert request.headers["accept-encoding"] == "identity"
+        return httpx.Response(
+            200,
+            headers={"content-encoding": "gzip"},
+            stream=httpx.ByteStream(gzip.compress(body)),
+        )
+
+    app = FastAPI()
+    app.include_router(proxy_router)
+    app.state.engine_http = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post("/api/chat", json={"messages": []})
+    await app.state.engine_http.aclose()
+
+    assert resp.status_code == 200
+    assert resp.content == body
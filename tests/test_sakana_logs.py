@@ -60,13 +60,14 @@ async def test_integration_stores_in_weaviate(monkeypatch):
             )
             self.data_object = types.SimpleNamespace(create=self.create)
 
-        def create(self, data_object, class_name):
+        def create(self, data_object, class_name, uuid=None):
             recorded["event"] = data_object
             recorded["class"] = class_name
+            recorded["uuid"] = uuid
 
-    import mem.weaviate as wv
+    import weaviate
 
-    monkeypatch.setattr(wv.weaviate, "Client", DummyClient)
+    monkeypatch.setattr(weaviate, "Client", DummyClient)
 
     event = {"run_id": "123", "level": "info", "message": "test"}
     await sakana.write(event)
@@ -74,3 +75,4 @@ async def test_integration_stores_in_weaviate(monkeypatch):
     assert recorded["class"] == "MemoryEvent"
     assert recorded["event"] == event
     assert recorded["event"]["level"] == "info"
+    assert recorded["uuid"][14] == "7"  # time-ordered UUIDv7
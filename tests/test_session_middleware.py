@@ -7,7 +7,7 @@ from starlette.middleware.base import BaseHTTPMiddleware
 
 os.environ["MEM_BACKEND"] = "none"
 
-from middleware.session import _session_id, session_mw
+from middleware.session import SessionMiddleware, _session_id, session_mw
 
 
 @pytest.mark.asyncio
@@ -49,3 +49,47 @@ async def test_valid_request_sets_header_and_state():
     expected_sid = _session_id("user123", "UnitTest")
     assert resp.status_code == 200
     assert resp.headers.get("x-attach-session") == expected_sid[:16]
+
+
+@pytest.mark.asyncio
+async def test_asgi_middleware_sets_header_and_state():
+    async def add_sub(request: Request, call_next):
+        request.state.sub = "user123"
+        return await call_next(request)
+
+    app = FastAPI()
+    app.add_middleware(SessionMiddleware)
+    app.add_middleware(BaseHTTPMiddleware, dispatch=add_sub)
+
+    @app.get("/ping")
+    async def ping(request: Request):
+        return {"message": "pong"}
+
+    headers = {"User-Agent": "UnitTest"}
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/ping", headers=headers)
+        anon = await client.get("/docs")
+
+    expected_sid = _session_id("user123", "UnitTest")
+    assert resp.status_code == 200
+    assert resp.headers.get("x-attach-session") == expected_sid[:16]
+    assert resp.headers.get("x-attach-user") == "user123"
+    assert "x-attach-session" not in anon.headers
+
+
+def test_session_secret_read_once(monkeypatch):
+    """Every session id uses the key read on first use, even after a cache miss."""
+    from middleware.session import _session_key
+
+    _session_key.cache_clear()
+    _session_id.cache_clear()
+    monkeypatch.setenv("SESSION_SECRET", "first")
+    try:
+        before = _session_id("user123", "UnitTest")
+        monkeypatch.setenv("SESSION_SECRET", "second")
+        _session_id.cache_clear()
+        assert _session_id("user123", "UnitTest") == before
+    finally:
+        _session_key.cache_clear()
+        _session_id.cache_clear()
@@ -1,16 +1,49 @@
-import pytest
+import asyncio
 import os
+import threading
 import time
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
+
 import httpx
+import pytest
 from jose import jwt
 
-from auth.oidc import verify_jwt, verify_jwt_with_exchange, _exchange_jwt_descope, _verify_jwt_direct, _fetch_jwks
+import auth.oidc
+from auth.oidc import (
+    _exchange_jwt_descope,
+    _fetch_jwks,
+    _verify_jwt_direct,
+    verify_jwt,
+    verify_jwt_with_exchange,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_verify_cache():
+    """Tests reuse the same fake token; never serve cached claims or rejections.
+
+    The shared HTTP client is reset too, since each test runs its own loop,
+    as are the cached issuer/audience and cache limits since fixtures patch
+    the environment.
+    """
+    auth.oidc._VERIFY_CACHE.clear()
+    auth.oidc._REJECT_CACHE.clear()
+    auth.oidc._HTTP = None
+    auth.oidc._get_oidc_issuer.cache_clear()
+    auth.oidc._get_oidc_audience.cache_clear()
+    auth.oidc._verify_cache_limits.cache_clear()
+    yield
+    auth.oidc._VERIFY_CACHE.clear()
+    auth.oidc._REJECT_CACHE.clear()
+    auth.oidc._HTTP = None
+    auth.oidc._get_oidc_issuer.cache_clear()
+    auth.oidc._get_oidc_audience.cache_clear()
+    auth.oidc._verify_cache_limits.cache_clear()
 
 
 class TestJWTVerification:
     """Test JWT verification functionality with backward compatibility."""
-    
+
     @pytest.fixture
     def mock_jwks_response(self):
         """Mock JWKS response data."""
@@ -22,20 +55,20 @@ class TestJWTVerification:
                     "use": "sig",
                     "alg": "RS256",
                     "n": "example-modulus",
-                    "e": "AQAB"
+                    "e": "AQAB",
                 }
             ]
         }
-    
+
     @pytest.fixture
     def mock_descope_token_response(self):
         """Mock Descope token exchange response."""
         return {
             "access_token": "descope-jwt-token",
             "token_type": "Bearer",
-            "expires_in": 3600
+            "expires_in": 3600,
         }
-    
+
     @pytest.fixture
     def sample_jwt_claims(self):
         """Sample JWT claims for testing."""
@@ -45,9 +78,9 @@ class TestJWTVerification:
             "sub": "user-123",
             "exp": int(time.time()) + 3600,
             "iat": int(time.time()),
-            "scope": "read write"
+            "scope": "read write",
         }
-    
+
     @pytest.fixture
     def env_vars_auth0(self):
         """Set up environment variables for Auth0 (default/backward compatible)."""
@@ -56,10 +89,10 @@ class TestJWTVerification:
             "OIDC_AUD": "test-audience",
             "AUTH_BACKEND": "auth0",
         }
-        
+
         with patch.dict(os.environ, env_vars, clear=True):
             yield env_vars
-    
+
     @pytest.fixture
     def env_vars_descope(self):
         """Set up environment variables for Descope backend."""
@@ -70,154 +103,478 @@ class TestJWTVerification:
             "DESCOPE_PROJECT_ID": "test-project",
             "DESCOPE_CLIENT_ID": "test-client-id",
             "DESCOPE_CLIENT_SECRET": "test-client-secret",
-            "DESCOPE_BASE_URL": "https://api.descope.com"
+            "DESCOPE_BASE_URL": "https://api.descope.com",
         }
-        
+
         with patch.dict(os.environ, env_vars, clear=True):
             yield env_vars
 
-    def test_verify_jwt_backward_compatible(self, env_vars_auth0, mock_jwks_response, sample_jwt_claims):
+    def test_verify_jwt_backward_compatible(
+        self, env_vars_auth0, mock_jwks_response, sample_jwt_claims
+    ):
         """Test that the original sync verify_jwt function still works (backward compatibility)."""
-        with patch('httpx.get') as mock_get:
+        with patch("httpx.get") as mock_get:
             # Mock JWKS response
             mock_response = MagicMock()
             mock_response.json.return_value = mock_jwks_response
             mock_response.raise_for_status.return_value = None
             mock_get.return_value = mock_response
-            
-            with patch('jose.jwt.decode', return_value=sample_jwt_claims) as mock_decode:
-                
-                with patch('jose.jwt.get_unverified_header') as mock_header:
+
+            with patch(
+                "jose.jwt.decode", return_value=sample_jwt_claims
+            ) as mock_decode:
+
+                with patch("jose.jwt.get_unverified_header") as mock_header:
                     mock_header.return_value = {"alg": "RS256", "kid": "test-key-id"}
-                    
+
                     result = verify_jwt("test.jwt.token")
-                    
+
                     assert result == sample_jwt_claims
                     assert result["iss"] == "https://dev-test.auth0.com/"
                     assert result["aud"] == "test-audience"
-                    
+
                     mock_decode.assert_called_once()
 
+    def test_verify_jwt_caches_successful_verification(
+        self, env_vars_auth0, mock_jwks_response, sample_jwt_claims
+    ):
+        """A repeated token is served from the claims cache without re-decoding."""
+        with patch("httpx.get") as mock_get:
+            mock_response = MagicMock()
+            mock_response.json.return_value = mock_jwks_response
+            mock_response.raise_for_status.return_value = None
+            mock_get.return_value = mock_response
+
+            with patch(
+                "jose.jwt.decode", return_value=sample_jwt_claims
+            ) as mock_decode:
+                with patch("jose.jwt.get_unverified_header") as mock_header:
+                    mock_header.return_value = {"alg": "RS256", "kid": "test-key-id"}
+
+                    assert verify_jwt("test.jwt.token") == sample_jwt_claims
+                    assert verify_jwt("test.jwt.token") == sample_jwt_claims
+
+                    mock_decode.assert_called_once()
+
+    def test_verify_jwt_cache_respects_ttl(
+        self, env_vars_auth0, mock_jwks_response, sample_jwt_claims, monkeypatch
+    ):
+        """JWT_CACHE_TTL caps how long claims are served from the cache."""
+        monkeypatch.setattr(auth.oidc, "_verify_cache_limits", lambda: (10_000, 0))
+        with patch("httpx.get") as mock_get:
+            mock_response = MagicMock()
+            mock_response.json.return_value = mock_jwks_response
+            mock_response.raise_for_status.return_value = None
+            mock_get.return_value = mock_response
+
+            with patch(
+                "jose.jwt.decode", return_value=sample_jwt_claims
+            ) as mock_decode:
+                with patch("jose.jwt.get_unverified_header") as mock_header:
+                    mock_header.return_value = {"alg": "RS256", "kid": "test-key-id"}
+
+                    verify_jwt("test.jwt.token")
+                    verify_jwt("test.jwt.token")
+
+                    assert mock_decode.call_count == 2
+
     @pytest.mark.asyncio
-    async def test_verify_jwt_with_exchange_direct_success(self, env_vars_auth0, mock_jwks_response, sample_jwt_claims):
+    async def test_verify_jwt_with_exchange_direct_success(
+        self, env_vars_auth0, mock_jwks_response, sample_jwt_claims
+    ):
         """Test verify_jwt_with_exchange when direct verification succeeds."""
-        with patch('httpx.get') as mock_get:
+        with patch("httpx.get") as mock_get:
             # Mock JWKS response
             mock_response = MagicMock()
             mock_response.json.return_value = mock_jwks_response
             mock_response.raise_for_status.return_value = None
             mock_get.return_value = mock_response
-            
-            with patch('jose.jwt.decode', return_value=sample_jwt_claims) as mock_decode:
-                
-                with patch('jose.jwt.get_unverified_header') as mock_header:
+
+            with patch(
+                "jose.jwt.decode", return_value=sample_jwt_claims
+            ) as mock_decode:
+
+                with patch("jose.jwt.get_unverified_header") as mock_header:
                     mock_header.return_value = {"alg": "RS256", "kid": "test-key-id"}
-                    
+
                     result = await verify_jwt_with_exchange("test.jwt.token")
-                    
+
                     assert result == sample_jwt_claims
                     mock_decode.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_exchange_jwt_descope_success(self, mock_descope_token_response):
         """Test successful JWT exchange with Descope."""
-        with patch.dict(os.environ, {
-            "DESCOPE_PROJECT_ID": "test-project",
-            "DESCOPE_CLIENT_ID": "test-client-id",
-            "DESCOPE_CLIENT_SECRET": "test-client-secret"
-        }):
-            with patch('httpx.AsyncClient') as mock_client:
-                # Mock the async context manager
+        with patch.dict(
+            os.environ,
+            {
+                "DESCOPE_PROJECT_ID": "test-project",
+                "DESCOPE_CLIENT_ID": "test-client-id",
+                "DESCOPE_CLIENT_SECRET": "test-client-secret",
+            },
+        ):
+            with patch("auth.oidc._http_client") as mock_client:
+                # Mock the shared client
                 mock_response = MagicMock()
                 mock_response.status_code = 200
                 mock_response.json.return_value = mock_descope_token_response
                 mock_response.raise_for_status.return_value = None
-                
-                mock_client.return_value.__aenter__.return_value.post.return_value = mock_response
-                
+
+                mock_client.return_value.post = AsyncMock(return_value=mock_response)
+
                 external_jwt = "external.jwt.token"
                 external_issuer = "https://external-idp.com"
-                
+
                 result = await _exchange_jwt_descope(external_jwt, external_issuer)
-                
+
                 assert result == "descope-jwt-token"
-                
-                mock_client.return_value.__aenter__.return_value.post.assert_called_once()
-                call_args = mock_client.return_value.__aenter__.return_value.post.call_args
-                
+
+                mock_client.return_value.post.assert_called_once()
+                call_args = mock_client.return_value.post.call_args
+
                 assert "oauth2/v1/apps/token" in call_args[0][0]
-                assert call_args[1]["data"]["grant_type"] == "urn:ietf:params:oauth:grant-type:jwt-bearer"
+                assert (
+                    call_args[1]["data"]["grant_type"]
+                    == "urn:ietf:params:oauth:grant-type:jwt-bearer"
+                )
                 assert call_args[1]["data"]["assertion"] == external_jwt
                 assert call_args[1]["data"]["issuer"] == external_issuer
 
     @pytest.mark.asyncio
-    async def test_verify_jwt_with_exchange_fallback(self, mock_jwks_response, mock_descope_token_response, sample_jwt_claims):
-        """Test verify_jwt_with_exchange with fallback to token exchange."""
+    async def test_verify_jwt_with_exchange_fallback(
+        self, mock_jwks_response, mock_descope_token_response, sample_jwt_claims
+    ):
+        """A token from a foreign issuer goes straight to the Descope exchange."""
         env_vars = {
             "OIDC_ISSUER": "https://dev-test.auth0.com/",
             "OIDC_AUD": "test-audience",
             "ENABLE_DESCOPE_EXCHANGE": "true",
             "DESCOPE_PROJECT_ID": "test-project",
             "DESCOPE_CLIENT_ID": "test-client-id",
-            "DESCOPE_CLIENT_SECRET": "test-client-secret"
+            "DESCOPE_CLIENT_SECRET": "test-client-secret",
         }
-        
+
         with patch.dict(os.environ, env_vars, clear=True):
-            with patch('httpx.get') as mock_get:
+            with patch("httpx.get") as mock_get:
                 # Mock JWKS response
                 mock_jwks_resp = MagicMock()
                 mock_jwks_resp.json.return_value = mock_jwks_response
                 mock_jwks_resp.raise_for_status.return_value = None
                 mock_get.return_value = mock_jwks_resp
-                
-                with patch('jose.jwt.get_unverified_header') as mock_header:
+
+                with patch("jose.jwt.get_unverified_header") as mock_header:
                     mock_header.return_value = {"alg": "RS256", "kid": "test-key-id"}
-                    
-                    with patch('jose.jwt.get_unverified_claims') as mock_claims:
+
+                    with patch("jose.jwt.get_unverified_claims") as mock_claims:
                         mock_claims.return_value = {"iss": "https://external-idp.com"}
-                        
-                        with patch('jose.jwt.decode') as mock_decode:
-                            mock_decode.side_effect = [
-                                ValueError("signing key not found in issuer JWKS"),  
-                                sample_jwt_claims  
-                            ]
-                            
+
+                        with patch("jose.jwt.decode") as mock_decode:
+                            mock_decode.return_value = sample_jwt_claims
+
                             # Mock the Descope exchange
-                            with patch('httpx.AsyncClient') as mock_client:
+                            with patch("auth.oidc._http_client") as mock_client:
                                 mock_exchange_response = MagicMock()
                                 mock_exchange_response.status_code = 200
-                                mock_exchange_response.json.return_value = mock_descope_token_response
-                                mock_exchange_response.raise_for_status.return_value = None
-                                
-                                mock_client.return_value.__aenter__.return_value.post.return_value = mock_exchange_response
-                                
-                                result = await verify_jwt_with_exchange("external.jwt.token")
-                                
+                                mock_exchange_response.json.return_value = (
+                                    mock_descope_token_response
+                                )
+                                mock_exchange_response.raise_for_status.return_value = (
+                                    None
+                                )
+
+                                mock_client.return_value.post = AsyncMock(
+                                    return_value=mock_exchange_response
+                                )
+
+                                result = await verify_jwt_with_exchange(
+                                    "external.jwt.token"
+                                )
+
                                 assert result == sample_jwt_claims
-      
-                                mock_client.return_value.__aenter__.return_value.post.assert_called_once()
 
-                                assert mock_decode.call_count == 2
+                                mock_client.return_value.post.assert_called_once()
+
+                                # Only the exchanged Descope token is decoded
+                                assert mock_decode.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_exchanges_for_same_token_share_one_call(
+        self, mock_descope_token_response, sample_jwt_claims
+    ):
+        """Requests racing with the same new token trigger a single Descope exchange."""
+        env_vars = {
+            "OIDC_ISSUER": "https://dev-test.auth0.com/",
+            "OIDC_AUD": "test-audience",
+            "DESCOPE_PROJECT_ID": "test-project",
+            "DESCOPE_CLIENT_ID": "test-client-id",
+            "DESCOPE_CLIENT_SECRET": "test-client-secret",
+        }
+
+        async def slow_post(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            resp = MagicMock()
+            resp.json.return_value = mock_descope_token_response
+            resp.raise_for_status.return_value = None
+            return resp
+
+        with (
+            patch.dict(os.environ, env_vars, clear=True),
+            patch(
+                "jose.jwt.get_unverified_header",
+                return_value={"alg": "RS256", "kid": "test-key-id"},
+            ),
+            patch(
+                "jose.jwt.get_unverified_claims",
+                return_value={"iss": "https://external-idp.com"},
+            ),
+            patch("jose.jwt.decode", return_value=sample_jwt_claims),
+            patch("auth.oidc._signing_key"),
+            patch("auth.oidc._http_client") as mock_client,
+        ):
+            mock_client.return_value.post = AsyncMock(side_effect=slow_post)
+
+            results = await asyncio.gather(
+                *(verify_jwt_with_exchange("external.jwt.token") for _ in range(3))
+            )
+
+        assert results == [sample_jwt_claims] * 3
+        mock_client.return_value.post.assert_called_once()
+        assert not auth.oidc._EXCHANGE_INFLIGHT
+
+    @pytest.mark.asyncio
+    async def test_transient_exchange_failure_is_not_cached(
+        self, mock_descope_token_response, sample_jwt_claims
+    ):
+        """A Descope outage fails the request but is not remembered as a rejection."""
+        env_vars = {
+            "OIDC_ISSUER": "https://dev-test.auth0.com/",
+            "OIDC_AUD": "test-audience",
+            "DESCOPE_PROJECT_ID": "test-project",
+            "DESCOPE_CLIENT_ID": "test-client-id",
+            "DESCOPE_CLIENT_SECRET": "test-client-secret",
+        }
+        ok = MagicMock()
+        ok.json.return_value = mock_descope_token_response
+        ok.raise_for_status.return_value = None
+
+        with (
+            patch.dict(os.environ, env_vars, clear=True),
+            patch(
+                "jose.jwt.get_unverified_header",
+                return_value={"alg": "RS256", "kid": "test-key-id"},
+            ),
+            patch(
+                "jose.jwt.get_unverified_claims",
+                return_value={"iss": "https://external-idp.com"},
+            ),
+            patch("jose.jwt.decode", return_value=sample_jwt_claims),
+            patch("auth.oidc._signing_key"),
+            patch("auth.oidc._http_client") as mock_client,
+        ):
+            mock_client.return_value.post = AsyncMock(
+                side_effect=[httpx.ConnectError("descope down"), ok]
+            )
+
+            with pytest.raises(auth.oidc.TokenExchangeError):
+                await verify_jwt_with_exchange("external.jwt.token")
+            assert not auth.oidc._REJECT_CACHE
+
+            result = await verify_jwt_with_exchange("external.jwt.token")
+
+        assert result == sample_jwt_claims
 
     def test_auth_backend_defaults_to_auth0(self):
         """Test that AUTH_BACKEND defaults to 'auth0' for backward compatibility."""
         with patch.dict(os.environ, {}, clear=True):
             from auth.oidc import _get_auth_backend
+
             assert _get_auth_backend() == "auth0"
 
     def test_verify_jwt_invalid_algorithm(self, env_vars_auth0):
         """Test JWT verification with invalid algorithm."""
-        with patch('jose.jwt.get_unverified_header') as mock_header:
+        with patch("jose.jwt.get_unverified_header") as mock_header:
             mock_header.return_value = {"alg": "HS256", "kid": "test-key-id"}
-            
+
             with pytest.raises(ValueError, match="alg 'HS256' not allowed"):
                 verify_jwt("test.jwt.token")  # Test sync version
 
+    def test_verify_jwt_rejection_is_cached_briefly(self, env_vars_auth0):
+        """A rejected token is refused again without re-running verification."""
+        with patch("jose.jwt.get_unverified_header") as mock_header:
+            mock_header.return_value = {"alg": "HS256", "kid": "test-key-id"}
+
+            for _ in range(3):
+                with pytest.raises(ValueError, match="alg 'HS256' not allowed"):
+                    verify_jwt("test.jwt.token")
+
+            mock_header.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_verify_jwt_with_exchange_invalid_algorithm(self, env_vars_auth0):
         """Test JWT verification with invalid algorithm on async version."""
-        with patch('jose.jwt.get_unverified_header') as mock_header:
+        with patch("jose.jwt.get_unverified_header") as mock_header:
             mock_header.return_value = {"alg": "HS256", "kid": "test-key-id"}
-            
+
             with pytest.raises(ValueError, match="alg 'HS256' not allowed"):
-                await verify_jwt_with_exchange("test.jwt.token")  # Test async version
\ No newline at end of file
+                await verify_jwt_with_exchange("test.jwt.token")  # Test async version
+
+
+@pytest.mark.asyncio
+async def test_stale_jwks_is_served_while_refreshing(monkeypatch):
+    """A stale JWKS entry is returned immediately and refreshed in the background."""
+    issuer = "https://stale.example/"
+    refreshed = []
+
+    async def fake_fetch_async(iss):
+        refreshed.append(iss)
+        return auth.oidc._store_jwks(iss, [{"kid": "new"}])
+
+    monkeypatch.setattr(auth.oidc, "_fetch_jwks_async", fake_fetch_async)
+    monkeypatch.setitem(
+        auth.oidc._JWKS_CACHE,
+        issuer,
+        {
+            "ts": time.monotonic() - 10_000,
+            "keys": [{"kid": "old"}],
+            "index": {"old": {"kid": "old"}},
+            "parsed": {},
+        },
+    )
+
+    entry = auth.oidc._jwks_entry(issuer)
+    assert "old" in entry["index"]
+
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert refreshed == [issuer]
+    assert "new" in auth.oidc._JWKS_CACHE[issuer]["index"]
+
+
+def test_unknown_kid_does_not_refetch_fresh_jwks(monkeypatch):
+    """Unknown kids against a freshly fetched JWKS fail without another fetch."""
+    issuer = "https://fresh.example/"
+    fetch = MagicMock()
+    monkeypatch.setattr(auth.oidc, "_fetch_jwks", fetch)
+    monkeypatch.setitem(
+        auth.oidc._JWKS_CACHE,
+        issuer,
+        {
+            "ts": time.monotonic(),
+            "keys": [{"kid": "a"}],
+            "index": {"a": {"kid": "a"}},
+            "parsed": {},
+        },
+    )
+
+    for _ in range(3):
+        with pytest.raises(ValueError, match="signing key not found"):
+            auth.oidc._signing_key(issuer, "bogus", "RS256")
+    fetch.assert_not_called()
+
+
+def test_verify_cache_evicts_least_recently_used(monkeypatch):
+    """A cache hit refreshes an entry, so the untouched one is evicted first."""
+    monkeypatch.setattr(auth.oidc, "_verify_cache_limits", lambda: (2, 300))
+    claims = {"sub": "u", "exp": time.time() + 600}
+
+    auth.oidc._cache_claims(b"a", claims)
+    auth.oidc._cache_claims(b"b", claims)
+    assert auth.oidc._cached_claims(b"a") is claims
+    auth.oidc._cache_claims(b"c", claims)
+
+    assert list(auth.oidc._VERIFY_CACHE) == [b"a", b"c"]
+
+
+def test_cold_jwks_is_fetched_once_by_concurrent_verifiers(monkeypatch):
+    """Threads racing on a cold cache share a single JWKS download."""
+    issuer = "https://cold.example/"
+    calls = []
+
+    def slow_fetch(iss):
+        calls.append(iss)
+        time.sleep(0.05)
+        return auth.oidc._store_jwks(iss, [{"kid": "a"}])
+
+    monkeypatch.setattr(auth.oidc, "_fetch_jwks", slow_fetch)
+    monkeypatch.delitem(auth.oidc._JWKS_CACHE, issuer, raising=False)
+    try:
+        threads = [
+            threading.Thread(target=auth.oidc._jwks_entry, args=(issuer,))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        auth.oidc._JWKS_CACHE.pop(issuer, None)
+
+    assert calls == [issuer]
+
+
+def _stale_entry(kid):
+    return {
+        "ts": time.monotonic() - 10_000,
+        "keys": [{"kid": kid}],
+        "index": {kid: {"kid": kid}},
+        "parsed": {},
+    }
+
+
+@pytest.mark.asyncio
+async def test_stale_jwks_from_worker_threads_refreshes_on_loop(monkeypatch):
+    """Verifier threads keep the stale keys and leave one refresh to the app loop."""
+    issuer = "https://stale-threads.example/"
+    refreshed = []
+
+    async def fake_fetch_async(iss):
+        refreshed.append(iss)
+        return auth.oidc._store_jwks(iss, [{"kid": "new"}])
+
+    blocking_fetch = MagicMock()
+    monkeypatch.setattr(auth.oidc, "_fetch_jwks_async", fake_fetch_async)
+    monkeypatch.setattr(auth.oidc, "_fetch_jwks", blocking_fetch)
+    monkeypatch.setattr(auth.oidc, "_JWKS_LOOP", asyncio.get_running_loop())
+    monkeypatch.setitem(auth.oidc._JWKS_CACHE, issuer, _stale_entry("old"))
+
+    seen = []
+    threads = [
+        threading.Thread(target=lambda: seen.append(auth.oidc._jwks_entry(issuer)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+    assert all("old" in entry["index"] for entry in seen)
+    blocking_fetch.assert_not_called()
+    assert refreshed == [issuer]
+    assert "new" in auth.oidc._JWKS_CACHE[issuer]["index"]
+
+
+def test_stale_jwks_without_loop_is_fetched_once(monkeypatch):
+    """With no app loop to hand off to, racing threads share one blocking fetch."""
+    issuer = "https://stale-noloop.example/"
+    calls = []
+
+    def slow_fetch(iss):
+        calls.append(iss)
+        time.sleep(0.05)
+        return auth.oidc._store_jwks(iss, [{"kid": "new"}])
+
+    monkeypatch.setattr(auth.oidc, "_fetch_jwks", slow_fetch)
+    monkeypatch.setattr(auth.oidc, "_JWKS_LOOP", None)
+    monkeypatch.setitem(auth.oidc._JWKS_CACHE, issuer, _stale_entry("old"))
+
+    threads = [
+        threading.Thread(target=auth.oidc._jwks_entry, args=(issuer,)) for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls == [issuer]
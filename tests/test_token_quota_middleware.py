@@ -1,4 +1,5 @@
 import os
+import time
 
 import pytest
 from fastapi import FastAPI, Request
@@ -8,7 +9,8 @@ pytest.importorskip("tiktoken")
 
 from starlette.responses import StreamingResponse
 
-from middleware.quota import InMemoryMeterStore, TokenQuotaMiddleware
+import middleware.quota as quota
+from middleware.quota import InMemoryMeterStore, RedisMeterStore, TokenQuotaMiddleware
 
 
 @pytest.mark.asyncio
@@ -72,3 +74,102 @@ async def test_midstream_over_limit_rolls_back(monkeypatch):
     assert resp.json()["detail"] == "token quota exceeded"
     total = await store.peek_total("carol")
     assert total == 2
+
+
+@pytest.mark.asyncio
+async def test_midstream_breach_stops_generation(monkeypatch):
+    monkeypatch.setenv("MAX_TOKENS_PER_MIN", "20")
+    app = FastAPI()
+    app.add_middleware(TokenQuotaMiddleware, store=InMemoryMeterStore())
+    produced = 0
+
+    @app.get("/stream")
+    async def stream():
+        async def gen():
+            nonlocal produced
+            for _ in range(50):
+                produced += 1
+                yield b"hello world " * 5
+
+        return StreamingResponse(gen(), media_type="text/plain")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get("/stream")
+
+    assert resp.status_code == 429
+    assert resp.json()["detail"] == "token quota exceeded"
+    assert produced < 5
+
+
+@pytest.mark.asyncio
+async def test_streamer_defers_tokenising_then_rolls_back_breach(monkeypatch):
+    """Chunks that fit the byte budget are counted later, in one batch."""
+    calls = []
+    real_batch = quota._num_tokens_batch
+
+    def spy(texts, model="cl100k_base"):
+        calls.append(list(texts))
+        return real_batch(texts, model)
+
+    monkeypatch.setattr(quota, "_num_tokens_batch", spy)
+    store = InMemoryMeterStore()
+    streamer = TokenQuotaMiddleware._Streamer(
+        user="dave", store=store, max_tokens=4, is_textual=True
+    )
+
+    await streamer.push(b"hi")  # 2 bytes <= 4 remaining: cannot breach yet
+    assert calls == []
+    assert not streamer.quota_exceeded
+
+    await streamer.push(b" world" * 5)
+    assert calls == [["hi", " world" * 5]]
+    assert streamer.quota_exceeded
+    # Only the chunk before the breach stays charged
+    assert await store.peek_total("dave") == quota._num_tokens("hi")
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis needs it for EVALSHA
+    import redis.asyncio
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        redis.asyncio,
+        "from_url",
+        lambda url, **kw: fakeredis.FakeAsyncRedis(server=server, **kw),
+    )
+
+
+@pytest.mark.asyncio
+async def test_redis_store_keeps_running_total(fake_redis):
+    store = RedisMeterStore("redis://test", window=60)
+
+    assert await store.increment("erin", 5) == (5, pytest.approx(time.time(), abs=5))
+    total, _ = await store.adjust("erin", -2)
+    assert total == 3
+    assert await store.peek_total("erin") == 3
+    assert 0 < await store.redis.ttl("attach:quota:erin:sum") <= 60
+    assert 0 < await store.redis.ttl("attach:quota:erin") <= 60
+
+
+@pytest.mark.asyncio
+async def test_redis_store_trims_expired_and_legacy_members(fake_redis):
+    store = RedisMeterStore("redis://test", window=60)
+    key = "attach:quota:frank"
+    now = time.time()
+    # Entries written before the nonce was added are "<ts>:<tokens>"
+    await store.redis.zadd(key, {f"{now - 120}:7": now - 120, f"{now - 5}:3": now - 5})
+
+    # No running total yet: rebuilt from the in-window members only
+    assert await store.peek_total("frank") == 3
+
+    # With a running total, entries leaving the window are subtracted
+    await store.redis.zadd(key, {f"{now - 90}:4:abcd1234": now - 90})
+    await store.redis.incrby(f"{key}:sum", 4)
+    total, oldest = await store.increment("frank", 2)
+    assert total == 5
+    assert oldest == pytest.approx(now - 5)
+    assert await store.redis.zcard(key) == 2
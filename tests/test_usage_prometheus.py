@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 
@@ -49,3 +50,92 @@ async def test_prometheus_backend_counts_tokens(monkeypatch):
     assert out_val > 0
     # Removed: assert in_val + out_val == sum(c.values.values())
     # The 'values' attribute only exists in the fallback Counter, not the real Prometheus Counter
+
+
+class _RecordingBackend:
+    def __init__(self):
+        self.batches = []
+        self.closed = False
+        self.counter = object()
+
+    async def record(self, **evt):
+        raise AssertionError("record_many should be preferred")
+
+    async def record_many(self, evts):
+        self.batches.append(list(evts))
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_queued_backend_flushes_full_batch_without_waiting():
+    from usage.backends import QueuedUsageBackend
+
+    inner = _RecordingBackend()
+    queued = QueuedUsageBackend(inner, batch_max=3, batch_wait=60)
+    for i in range(3):
+        await queued.record(user="u", tokens_in=i)
+    await asyncio.sleep(0.01)  # far below batch_wait
+
+    assert inner.batches == [[{"user": "u", "tokens_in": i} for i in range(3)]]
+    assert queued.counter is inner.counter  # /metrics reads through the wrapper
+    await queued.aclose()
+    assert inner.closed
+
+
+@pytest.mark.asyncio
+async def test_queued_backend_flushes_partial_batch_after_interval():
+    from usage.backends import QueuedUsageBackend
+
+    inner = _RecordingBackend()
+    queued = QueuedUsageBackend(inner, batch_max=100, batch_wait=0.01)
+    await queued.record(user="u", tokens_in=1)
+    await queued.record(user="u", tokens_in=2)
+    assert inner.batches == []
+
+    await asyncio.sleep(0.05)
+    assert inner.batches == [
+        [{"user": "u", "tokens_in": 1}, {"user": "u", "tokens_in": 2}]
+    ]
+    await queued.aclose()
+
+
+@pytest.mark.asyncio
+async def test_queued_backend_aclose_drains_before_closing():
+    from usage.backends import QueuedUsageBackend
+
+    recorded = []
+
+    class SingleBackend:
+        async def record(self, **evt):
+            recorded.append(evt)
+
+    inner = SingleBackend()
+    queued = QueuedUsageBackend(inner, batch_wait=0.01)
+    for i in range(5):
+        await queued.record(user="u", tokens_out=i)
+    await queued.aclose()
+
+    assert recorded == [{"user": "u", "tokens_out": i} for i in range(5)]
+    assert queued._consumer.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_label_lru_removes_evicted_series(monkeypatch):
+    import usage.backends as backends
+
+    monkeypatch.setattr(backends, "Counter", backends._FallbackCounter)
+    monkeypatch.setenv("ATTACH_PROM_MAX_LABELS", "2")
+    backend = backends.PrometheusUsageBackend()
+
+    for user in ("a", "b", "a", "c"):  # "a" is reused, so "b" is the LRU
+        await backend.record(user=user, model="m", tokens_in=1, tokens_out=1)
+
+    assert set(backend.counter.values) == {
+        ("a", "in", "m"),
+        ("a", "out", "m"),
+        ("c", "in", "m"),
+        ("c", "out", "m"),
+    }
+    assert backend.counter.values[("a", "in", "m")] == 2
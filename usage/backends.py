@@ -2,71 +2,146 @@ from __future__ import annotations
 
 """Usage accounting backends for Attach Gateway."""
 
-import inspect
+import asyncio
 import logging
 import os
-from datetime import datetime, timezone
+import threading
+import time
+from collections import OrderedDict
 from typing import Protocol
+from uuid import uuid4
 
-logger = logging.getLogger(__name__)
+from utils.env import int_env
 
 try:
-    from prometheus_client import Counter
-except Exception:  # pragma: no cover - optional dep
-    Counter = None  # type: ignore
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional speed-up
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+class _Value:
+    __slots__ = ("parent", "k")
+
+    def __init__(self, parent: _FallbackCounter, k: tuple[str, ...]) -> None:
+        self.parent = parent
+        self.k = k
+
+    def get(self) -> float:
+        return self.parent.values[self.k]
+
+
+class _Wrapper:
+    __slots__ = ("parent", "k")
+
+    def __init__(self, parent: _FallbackCounter, k: tuple[str, ...]) -> None:
+        self.parent = parent
+        self.k = k
+
+    def inc(self, amt: float) -> None:
+        parent = self.parent
+        with parent._lock:  # += on a dict item is not atomic across threads
+            parent.values[self.k] += amt
+
+    @property
+    def _value(self) -> _Value:
+        return _Value(self.parent, self.k)
 
-    class Counter:  # type: ignore[misc]
-        """Minimal in-memory Counter fallback."""
 
-        def __init__(self, name: str, desc: str, labelnames: list[str]):
-            self.labelnames = labelnames
-            self.values: dict[tuple[str, ...], float] = {}
+class _FallbackCounter:
+    """Minimal in-memory Counter, used when prometheus_client is missing."""
 
-        def labels(self, **labels):
-            key = tuple(labels.get(name, "") for name in self.labelnames)
+    __slots__ = ("labelnames", "values", "_children", "_lock")
+
+    def __init__(self, name: str, desc: str, labelnames: list[str]):
+        self.labelnames = labelnames
+        self.values: dict[tuple[str, ...], float] = {}
+        self._children: dict[tuple[str, ...], _Wrapper] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str, **labels):
+        if values:  # positional, in labelnames order (as prometheus_client)
+            key = tuple(values)
+        else:
+            key = tuple([labels.get(name, "") for name in self.labelnames])
+        child = self._children.get(key)
+        if child is None:
             self.values.setdefault(key, 0.0)
+            child = self._children[key] = _Wrapper(self, key)
+        return child
 
-            class _Wrapper:
-                def __init__(self, parent: Counter, k: tuple[str, ...]) -> None:
-                    self.parent = parent
-                    self.k = k
+    def remove(self, *values: str) -> None:
+        key = tuple(values)
+        self.values.pop(key, None)
+        self._children.pop(key, None)
 
-                def inc(self, amt: float) -> None:
-                    self.parent.values[self.k] += amt
 
-                @property
-                def _value(self):
-                    class V:
-                        def __init__(self, parent: Counter, k: tuple[str, ...]):
-                            self.parent = parent
-                            self.k = k
+try:
+    from prometheus_client import Counter
+except Exception:  # pragma: no cover - optional dep
+    Counter = _FallbackCounter  # type: ignore[misc,assignment]
+
 
-                        def get(self) -> float:
-                            return self.parent.values[self.k]
+# (epoch ms, formatted) of the last timestamp; events in the same ms share it
+_LAST_TIMESTAMP: tuple[int, str] = (-1, "")
 
-                    return V(self.parent, self.k)
 
-            return _Wrapper(self, key)
+def _utc_timestamp() -> str:
+    """Current UTC time as RFC 3339 with milliseconds, e.g. 2024-01-01T00:00:00.000Z."""
+    global _LAST_TIMESTAMP
+    epoch_ms = int(time.time() * 1000)
+    if epoch_ms == _LAST_TIMESTAMP[0]:
+        return _LAST_TIMESTAMP[1]
+    secs, ms = divmod(epoch_ms, 1000)
+    tm = time.gmtime(secs)
+    stamp = (
+        f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+        f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}.{ms:03d}Z"
+    )
+    _LAST_TIMESTAMP = (epoch_ms, stamp)
+    return stamp
 
 
 class AbstractUsageBackend(Protocol):
     """Interface for usage event sinks."""
 
-    async def record(self, **evt) -> None:
-        """Persist a single usage event."""
+    async def record(
+        self,
+        *,
+        user: str = "unknown",
+        tokens_in: int = 0,
+        tokens_out: int = 0,
+        model: str = "unknown",
+        **extra,
+    ) -> None:
+        """Persist a single usage event.
+
+        The quota middleware emits `tokens_in` / `tokens_out` as ints, so
+        backends use them as-is. Other event fields (project, request_id,
+        ts, detail) arrive in *extra*.
+        """
         ...
 
 
 class NullUsageBackend:
     """No-op usage backend."""
 
+    __slots__ = ()
+
     async def record(self, **evt) -> None:  # pragma: no cover - trivial
         return
 
 
+# Shared no-op instance; callers skip ``record`` entirely when they see it.
+NULL_BACKEND = NullUsageBackend()
+
+
 class PrometheusUsageBackend:
     """Expose a Prometheus counter for token usage."""
 
+    __slots__ = ("counter", "_handles", "_max_series")
+
     def __init__(self) -> None:
         if Counter is None:  # pragma: no cover - missing lib
             raise RuntimeError("prometheus_client is required for this backend")
@@ -75,19 +150,74 @@ class PrometheusUsageBackend:
             "Total tokens processed by Attach Gateway",
             ["user", "direction", "model"],
         )
-
-    async def record(self, **evt) -> None:
-        user = evt.get("user", "unknown")
-        model = evt.get("model", "unknown")
-        tokens_in = int(evt.get("tokens_in", 0) or 0)
-        tokens_out = int(evt.get("tokens_out", 0) or 0)
-        self.counter.labels(user=user, direction="in", model=model).inc(tokens_in)
-        self.counter.labels(user=user, direction="out", model=model).inc(tokens_out)
+        # (user, model) -> (in, out) label handles, resolved once per series.
+        # `user` is caller-controlled, so only the most recently used
+        # ATTACH_PROM_MAX_LABELS pairs keep a series; older ones are removed
+        # from the counter (their totals restart if the user comes back).
+        self._handles: "OrderedDict[tuple[str, str], tuple]" = OrderedDict()
+        self._max_series = int_env("ATTACH_PROM_MAX_LABELS", 5000)
+
+    def _add(self, user: str, model: str, tokens_in: int, tokens_out: int) -> None:
+        key = (user, model)
+        handles = self._handles.get(key)
+        if handles is not None:
+            self._handles.move_to_end(key)
+        else:
+            if self._max_series and len(self._handles) >= self._max_series:
+                self._evict_oldest()
+            handles = self._handles[key] = (
+                self.counter.labels(user, "in", model),
+                self.counter.labels(user, "out", model),
+            )
+        if tokens_in:
+            handles[0].inc(tokens_in)
+        if tokens_out:
+            handles[1].inc(tokens_out)
+
+    def _evict_oldest(self) -> None:
+        (user, model), _ = self._handles.popitem(last=False)
+        for direction in ("in", "out"):
+            try:
+                self.counter.remove(user, direction, model)
+            except KeyError:
+                pass
+
+    async def record(
+        self,
+        *,
+        user: str = "unknown",
+        tokens_in: int = 0,
+        tokens_out: int = 0,
+        model: str = "unknown",
+        **extra,
+    ) -> None:
+        if tokens_in or tokens_out:
+            self._add(user, model, tokens_in, tokens_out)
+
+    async def record_many(self, evts: list[dict]) -> None:
+        """Sum a batch per (user, model) so each series is incremented once."""
+        totals: dict[tuple[str, str], list[int]] = {}
+        for evt in evts:
+            tokens_in = evt.get("tokens_in", 0)
+            tokens_out = evt.get("tokens_out", 0)
+            if not (tokens_in or tokens_out):
+                continue
+            key = (evt.get("user", "unknown"), evt.get("model", "unknown"))
+            acc = totals.get(key)
+            if acc is None:
+                totals[key] = [tokens_in, tokens_out]
+            else:
+                acc[0] += tokens_in
+                acc[1] += tokens_out
+        for (user, model), (tokens_in, tokens_out) in totals.items():
+            self._add(user, model, tokens_in, tokens_out)
 
 
 class OpenMeterBackend:
     """Send token usage events to OpenMeter."""
 
+    __slots__ = ("api_key", "base_url", "client")
+
     def __init__(self) -> None:
         api_key = os.getenv("OPENMETER_API_KEY")
         if not api_key:
@@ -95,81 +225,191 @@ class OpenMeterBackend:
 
         self.api_key = api_key
         self.base_url = os.getenv("OPENMETER_URL", "https://openmeter.cloud")
-        
+
         # Use httpx instead of buggy OpenMeter SDK
         try:
             import httpx
-            self.client = httpx.AsyncClient(
-                timeout=30.0
-            )
         except ImportError as exc:
             raise ImportError("httpx is required for OpenMeter") from exc
 
+        # One pooled client for the backend's lifetime so events reuse warm
+        # connections; HTTP/2 multiplexing when the optional `h2` is present.
+        try:
+            import h2  # noqa: F401
+
+            http2 = True
+        except ImportError:
+            http2 = False
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {api_key}"},
+            http2=http2,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+            timeout=httpx.Timeout(5.0, connect=2.0),
+        )
+
     async def aclose(self) -> None:
         """Close the underlying HTTP client."""
-        if hasattr(self.client, 'aclose'):
+        if hasattr(self.client, "aclose"):
             await self.client.aclose()
 
-    async def record(self, **evt) -> None:
-        try:
-            from uuid import uuid4
-        except ImportError as exc:
-            return
-
-        base_time = datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
-        user = evt.get("user")
-        model = evt.get("model")
-        
-        tokens_in = int(evt.get("tokens_in", 0) or 0)
-        tokens_out = int(evt.get("tokens_out", 0) or 0)
-
-        # Send separate events for input and output tokens
-        events_to_send = []
-        
+    def _events(
+        self, user: str | None, model: str | None, tokens_in: int, tokens_out: int
+    ) -> list[dict]:
+        """Build the CloudEvents for one usage record (input and output)."""
+        base_time = _utc_timestamp()
+
+        # Separate events for input and output tokens
+        events = []
+
         if tokens_in > 0:
-            events_to_send.append({
-                "specversion": "1.0",
-                "type": "prompt",        # ← Changed from "tokens" to "prompt"
-                "id": str(uuid4()),
-                "time": base_time,
-                "source": "attach-gateway",
-                "subject": user,
-                "data": {
-                    "tokens": tokens_in,
-                    "model": model,
-                    "type": "input"      # ← This stays the same
+            events.append(
+                {
+                    "specversion": "1.0",
+                    "type": "prompt",  # ← Changed from "tokens" to "prompt"
+                    "id": str(uuid4()),
+                    "time": base_time,
+                    "source": "attach-gateway",
+                    "subject": user,
+                    "data": {
+                        "tokens": tokens_in,
+                        "model": model,
+                        "type": "input",  # ← This stays the same
+                    },
                 }
-            })
-        
+            )
+
         if tokens_out > 0:
-            events_to_send.append({
-                "specversion": "1.0", 
-                "type": "prompt",
-                "id": str(uuid4()),
-                "time": base_time,
-                "source": "attach-gateway",
-                "subject": user,
-                "data": {
-                    "tokens": tokens_out,   # ← Single tokens field
-                    "model": model,
-                    "type": "output"        # ← Add type field
+            events.append(
+                {
+                    "specversion": "1.0",
+                    "type": "prompt",
+                    "id": str(uuid4()),
+                    "time": base_time,
+                    "source": "attach-gateway",
+                    "subject": user,
+                    "data": {
+                        "tokens": tokens_out,  # ← Single tokens field
+                        "model": model,
+                        "type": "output",  # ← Add type field
+                    },
                 }
-            })
+            )
+        return events
 
+    async def _post(self, body: dict | list[dict], content_type: str) -> None:
+        # orjson (when installed) serialises the batch in C; same wire format
+        payload = {"content": orjson.dumps(body)} if orjson else {"json": body}
+        try:
+            response = await self.client.post(
+                "/api/v1/events",
+                **payload,
+                headers={"Content-Type": content_type},
+            )
+
+            if response.status_code not in [200, 201, 202, 204]:
+                logger.warning(f"OpenMeter error: {response.status_code}")
+
+        except Exception as exc:
+            logger.warning("OpenMeter request failed: %s", exc)
+
+    async def record(
+        self,
+        *,
+        user: str | None = None,
+        tokens_in: int = 0,
+        tokens_out: int = 0,
+        model: str | None = None,
+        **extra,
+    ) -> None:
         # Send each event
-        for event in events_to_send:
+        for event in self._events(user, model, tokens_in, tokens_out):
+            await self._post(event, "application/cloudevents+json")
+
+    async def record_many(self, evts: list[dict]) -> None:
+        """Send several usage records as one CloudEvents batch request."""
+        events = [
+            event
+            for evt in evts
+            for event in self._events(
+                evt.get("user"),
+                evt.get("model"),
+                evt.get("tokens_in", 0),
+                evt.get("tokens_out", 0),
+            )
+        ]
+        if events:
+            await self._post(events, "application/cloudevents-batch+json")
+
+
+class QueuedUsageBackend:
+    """Record usage off the request path.
+
+    `record` only enqueues; one background task hands the events to the
+    wrapped backend in batches (`record_many` when it has one). Attribute
+    access falls through to the wrapped backend, e.g. `counter` for /metrics.
+    """
+
+    def __init__(
+        self,
+        backend: AbstractUsageBackend,
+        *,
+        maxsize: int = 10_000,
+        batch_max: int = 256,
+        batch_wait: float = 0.05,
+    ) -> None:
+        self.backend = backend
+        self.batch_max = batch_max
+        self.batch_wait = batch_wait
+        self._queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=maxsize)
+        self._consumer: asyncio.Task | None = None
+
+    def __getattr__(self, name: str):
+        if name == "backend":  # not set yet (e.g. during copy/unpickle)
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    async def record(self, **evt) -> None:
+        if self._consumer is None or self._consumer.done():
+            self._consumer = asyncio.get_running_loop().create_task(self._drain())
+        try:
+            self._queue.put_nowait(evt)
+        except asyncio.QueueFull:
+            logger.warning("Usage queue full; dropping event")
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_wait
+            while len(batch) < self.batch_max:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                if hasattr(self.backend, "record_many"):
+                    await self.backend.record_many(batch)
+                else:
+                    for evt in batch:
+                        await self.backend.record(**evt)
+            except Exception:  # never let one bad batch stop the consumer
+                logger.warning("Dropping %d usage events", len(batch), exc_info=True)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def aclose(self) -> None:
+        """Flush queued events, then close the wrapped backend."""
+        if self._consumer is not None and not self._consumer.done():
+            await self._queue.join()
+            self._consumer.cancel()
             try:
-                response = await self.client.post(
-                    f"{self.base_url}/api/v1/events",
-                    json=event,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/cloudevents+json"
-                    }
-                )
-                
-                if response.status_code not in [200, 201, 202, 204]:
-                    logger.warning(f"OpenMeter error: {response.status_code}")
-                    
-            except Exception as exc:
-                logger.warning("OpenMeter request failed: %s", exc)
+                await self._consumer
+            except asyncio.CancelledError:
+                pass
+        if hasattr(self.backend, "aclose"):
+            await self.backend.aclose()
@@ -2,13 +2,14 @@ from __future__ import annotations
 
 """Factory for usage backends."""
 
+import functools
+import logging
 import os
 import warnings
-import logging
 
 from .backends import (
+    NULL_BACKEND,
     AbstractUsageBackend,
-    NullUsageBackend,
     OpenMeterBackend,
     PrometheusUsageBackend,
 )
@@ -29,21 +30,31 @@ def _select_backend() -> str:
     return os.getenv("USAGE_BACKEND", "null")
 
 
+@functools.lru_cache(maxsize=1)
+def _prometheus_backend() -> AbstractUsageBackend:
+    """Resolve the Prometheus backend once per process.
+
+    Its Counter lives in the global registry, and a failed attempt is not
+    worth repeating, so both outcomes are cached.
+    """
+    try:
+        return PrometheusUsageBackend()
+    except ImportError as exc:
+        log.warning(
+            "Prometheus metering unavailable: %s – "
+            "falling back to NullUsageBackend. "
+            "Install with: pip install 'attach-dev[usage]'",
+            exc,
+        )
+        return NULL_BACKEND
+
+
 def get_usage_backend(kind: str) -> AbstractUsageBackend:
     """Return an instance of the requested usage backend."""
     kind = (kind or "null").lower()
 
     if kind == "prometheus":
-        try:
-            return PrometheusUsageBackend()
-        except ImportError as exc:
-            log.warning(
-                "Prometheus metering unavailable: %s – "
-                "falling back to NullUsageBackend. "
-                "Install with: pip install 'attach-dev[usage]'",
-                exc
-            )
-            return NullUsageBackend()
+        return _prometheus_backend()
 
     if kind == "openmeter":
         # fail-fast on bad config
@@ -54,4 +65,4 @@ def get_usage_backend(kind: str) -> AbstractUsageBackend:
             )
         return OpenMeterBackend()  # exceptions inside bubble up
 
-    return NullUsageBackend()
+    return NULL_BACKEND
@@ -6,9 +6,12 @@ import os
 log = logging.getLogger(__name__)
 
 
-def int_env(var: str, default: int | None = None) -> int | None:
+def int_env(
+    var: str, default: int | None = None, *, allow_zero: bool = False
+) -> int | None:
     """Read $VAR as positive int.
     • '', 'null', 'none', 'false', 'infinite'  -> None
+    • '0' -> 0 when *allow_zero* (e.g. "0 disables"), else default
     • invalid / non-positive -> default
     """
     val = os.getenv(var)
@@ -19,6 +22,8 @@ def int_env(var: str, default: int | None = None) -> int | None:
         return None
     try:
         num = int(val)
+        if num == 0 and allow_zero:
+            return 0
         return num if num > 0 else default
     except ValueError:
         log.warning("⚠️  %s=%s is not a valid int; using default=%s", var, val, default)